@@ -1,18 +1,21 @@
 import asyncio
 import logging
-from typing import Union
+import time
+import uuid
 
 import streamlit as st
 from langchain_core.messages import AIMessage, HumanMessage
-from langchain_mcp_adapters.tools import load_mcp_tools
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import StdioServerParameters, stdio_client
-from PIL.Image import Image
 
-from src.agent.planner_agent import AgentState as PlannerAgentState
-from src.agent.planner_agent import build_agent as build_planner_agent
-from src.agent.react_agent import AgentState as ReactAgentState
-from src.agent.react_agent import build_agent as build_react_agent
+from src.agent.router import PLANNER_ROUTE, REACT_ROUTE, route_query
+from src.utilities.constants import REACT_ESCALATION_TOOL_CALLS
+from src.utilities.llm_scheduler import current_session_id, llm_scheduler
+from src.utilities.prefetch import (
+    WARM_UP_TOOL,
+    finish_repo_warm_up,
+    start_repo_warm_up,
+)
 
 logging.basicConfig(
     level=logging.INFO,
@@ -30,6 +33,16 @@ server_params = StdioServerParameters(
 )
 
 
+def tool_progress_callback(placeholders: list):
+    """Build a logging callback showing the progress messages of running tools in the latest placeholder."""
+
+    async def show_tool_progress(params):
+        if placeholders and params.level == "info":
+            placeholders[-1].caption(str(params.data))
+
+    return show_tool_progress
+
+
 def display_chat_history():
     for message in st.session_state.messages:
         if not message.content or message.content in [None, ""]:
@@ -53,21 +66,48 @@ async def main():
         )
         st.write(
             """
-            1. __ReAct Agent__ is useful for simpler tasks, cheaper and faster.
-            2. __Planner Agent__ is suitable for more complex tasks requiring detailed analysis.""",
+            1. __Auto__ picks the agent per question and escalates to the planner when needed.
+            2. __ReAct Agent__ is useful for simpler tasks, cheaper and faster.
+            3. __Planner Agent__ is suitable for more complex tasks requiring detailed analysis.""",
         )
 
         agent_type = st.selectbox(
-            "Which agent would you like to use?", ("ReAct Agent", "Planner Agent")
+            "Which agent would you like to use?",
+            ("Auto", "ReAct Agent", "Planner Agent"),
         )
 
         st.caption(
             "INFO: Please refresh the page to clear cache before changing the agent type."
         )
 
+        metrics = llm_scheduler.metrics()
+        st.caption(
+            f"LLM queue: {sum(metrics['queued'].values())} waiting, {metrics['in_flight']} in flight, "
+            f"avg wait {metrics['avg_wait_s']:.2f}s"
+        )
+
+    # LLM requests of this browser session are queued fairly against other sessions
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    current_session_id.set(st.session_state.session_id)
+
     # Initialize session state
     async with stdio_client(server_params) as (read, write):
-        async with ClientSession(read, write) as session:
+        # The agent dependencies (langgraph, langchain_openai, ...) are imported here, while the
+        # server process is starting, instead of delaying the first paint of the page
+        from langchain_mcp_adapters.tools import load_mcp_tools
+
+        from src.agent.planner_agent import AgentState as PlannerAgentState
+        from src.agent.planner_agent import build_agent as build_planner_agent
+        from src.agent.react_agent import AgentState as ReactAgentState
+        from src.agent.react_agent import build_agent as build_react_agent
+        from src.utilities.artifact_store import read_artifact
+
+        # Progress of long-running tools is streamed as log messages into the current placeholder
+        progress_placeholders = []
+        async with ClientSession(
+            read, write, logging_callback=tool_progress_callback(progress_placeholders)
+        ) as session:
             await session.initialize()
 
             if "messages" not in st.session_state:
@@ -79,36 +119,58 @@ async def main():
             display_chat_history()
 
             # Prerequisites for Agents
-            tools_available = await load_mcp_tools(session)
+            tools_available = [
+                tool
+                for tool in await load_mcp_tools(session)
+                if tool.name != WARM_UP_TOOL
+            ] + [read_artifact]
             tools_by_name = {tool.name: tool for tool in tools_available}
             # st.write("Available tools:", [tool for tool in tools][0])
 
-            agent = None
-            AgentState: Union(ReactAgentState | PlannerAgentState)
-            if agent_type == "ReAct Agent":
-                agent = await build_react_agent(tools_available)
-                AgentState = ReactAgentState
-            elif agent_type == "Planner Agent":
-                agent = await build_planner_agent()
-                AgentState = PlannerAgentState
+            react_agent = None
+            planner_agent = None
+            if agent_type in ("Auto", "ReAct Agent"):
+                react_agent = await build_react_agent(tools_available)
+            if agent_type in ("Auto", "Planner Agent"):
+                planner_agent = await build_planner_agent()
 
             # Implementing Agentic workflow
             if prompt := st.chat_input("How can I help?"):
                 st.chat_message("user").markdown(prompt)
                 st.session_state.messages.append(HumanMessage(content=prompt))
 
+                # Prefetch referenced repos on the server while the agent is planning
+                warm_ups = start_repo_warm_up(session, prompt)
+
+                progress_placeholders.append(st.empty())
                 with st.spinner("Thinking..."):
-                    if agent_type == "ReAct Agent":
-                        state = AgentState(
-                            messages=st.session_state.messages, tools=tools_by_name
+                    started = time.perf_counter()
+                    if agent_type == "Auto":
+                        route, reason = route_query(prompt)
+                    else:
+                        route = REACT_ROUTE if react_agent else PLANNER_ROUTE
+                        reason = "selected in sidebar"
+
+                    if route == REACT_ROUTE:
+                        state = ReactAgentState(
+                            messages=st.session_state.messages,
+                            tools=tools_by_name,
+                            max_tool_calls=(
+                                REACT_ESCALATION_TOOL_CALLS
+                                if agent_type == "Auto"
+                                else None
+                            ),
                         )
-                        st.session_state.messages = (await agent.ainvoke(state))[
-                            "messages"
-                        ]
+                        state = await react_agent.ainvoke(state)
+                        st.session_state.messages = state["messages"]
                         # st.write(state)
-                    elif agent_type == "Planner Agent":
-                        response = await agent.ainvoke(
-                            AgentState(
+                        if state.get("escalated"):
+                            route = f"{REACT_ROUTE}->{PLANNER_ROUTE}"
+                            reason += f", escalated after {state['tool_calls_made']} tool calls"
+
+                    if route != REACT_ROUTE:
+                        response = await planner_agent.ainvoke(
+                            PlannerAgentState(
                                 task=prompt,
                                 messages=st.session_state.messages,
                                 tools=tools_available,
@@ -119,6 +181,14 @@ async def main():
                             AIMessage(response["messages"][-1].content)
                         )
 
+                    logging.info(
+                        f"Routing decision: mode={agent_type!r} route={route} "
+                        f"latency={time.perf_counter() - started:.2f}s ({reason})"
+                    )
+
+                await finish_repo_warm_up(warm_ups)
+                progress_placeholders.pop().empty()
+
                 # Display tool message along with AIMessage
                 if len(st.session_state.messages) > 2:
                     tool_response = st.session_state.messages[-2].content
@@ -9,23 +9,19 @@ from langchain_core.messages import (
     ToolMessage,
 )
 from langchain_core.tools import BaseTool
-from langchain_openai import ChatOpenAI
 from langgraph.graph import END, START, StateGraph, add_messages
 from langgraph.prebuilt import create_react_agent
 from pydantic import BaseModel, Field
 
+from src.utilities.artifact_store import spill_large_output, with_spilled_output
 from src.utilities.constants import (
-    FINALIZER_LLM,
     FINALIZER_PROMPT,
-    PLANNER_LLM,
     PLANNER_SYSTEM_PROMPT,
-    REPLANNER_LLM,
     REPLANNER_PROMPT,
-    SIMPLE_ACTION_LLM,
     SIMPLE_ACTION_PROMPT,
-    SUMMARIZER_LLM,
     SUMMARY_PROMPT,
 )
+from src.utilities.model_policy import ainvoke_with_policy, chat_model
 
 
 class Plan(BaseModel):
@@ -61,8 +57,11 @@ async def planner_node(state: AgentState):
         ]
     )
 
-    llm = ChatOpenAI(model=PLANNER_LLM, temperature=0).with_structured_output(Plan)
-    plan = await llm.ainvoke(state["messages"])
+    plan = await ainvoke_with_policy(
+        "planner",
+        lambda model: chat_model(model).with_structured_output(Plan),
+        state["messages"],
+    )
     state["plan"] = plan
 
     return state
@@ -79,24 +78,34 @@ async def simple_react_agent(state: AgentState):
     task = plan[0]
 
     # Summarize past conversation history
-    summarizer_llm = ChatOpenAI(model=SUMMARIZER_LLM, temperature=0)
     summary_prompt = SUMMARY_PROMPT.format(messages=state["messages"])
-    summary = summarizer_llm.invoke(summary_prompt).content
+    summary = (
+        await ainvoke_with_policy("summarizer", chat_model, summary_prompt)
+    ).content
 
     task_formatted = SIMPLE_ACTION_PROMPT.format(
         plan_str=plan_str, task=task, conv_history=summary
     )
     # print(f'Tools right now: {state["tools"]}.\n')
 
-    # Agent LLM call
-    llm = ChatOpenAI(model=SIMPLE_ACTION_LLM, temperature=0)
-    agent_executor = create_react_agent(
-        model=llm, tools=state["tools"], prompt=task_formatted
-    )
-
-    agent_response = await agent_executor.ainvoke(
-        {"messages": [HumanMessage(content=task_formatted)]}
-    )
+    # Agent LLM call, large tool outputs are spilled before the executor LLM sees them
+    tools = [with_spilled_output(tool) for tool in state["tools"]]
+    try:
+        agent_response = await ainvoke_with_policy(
+            "executor",
+            lambda model: create_react_agent(
+                model=chat_model(model), tools=tools, prompt=task_formatted
+            ),
+            {"messages": [HumanMessage(content=task_formatted)]},
+        )
+    except TimeoutError:
+        # the executor has no fallback model, the replanner decides how to go on without this step
+        state["messages"].append(
+            AIMessage(
+                content=f"The step '{task}' did not finish in time, its result is not available."
+            )
+        )
+        return state
 
     state["messages"].extend(
         [create_message_copy(m) for m in agent_response["messages"]]
@@ -109,7 +118,7 @@ def create_message_copy(message):
     """Create a copy of a message maintaining only the required attributes for better context management."""
     if isinstance(message, ToolMessage):
         return ToolMessage(
-            content=message.content,
+            content=spill_large_output(message.content),
             tool_call_id=message.tool_call_id,  # Important for tool calling
             id=getattr(message, "id", None),
         )
@@ -139,8 +148,11 @@ async def replanner_node(state: AgentState):
         )
     )
 
-    llm = ChatOpenAI(model=REPLANNER_LLM, temperature=0).with_structured_output(Plan)
-    plan = await llm.ainvoke(state["messages"])
+    plan = await ainvoke_with_policy(
+        "replanner",
+        lambda model: chat_model(model).with_structured_output(Plan),
+        state["messages"],
+    )
     state["plan"] = plan
 
     return state
@@ -157,8 +169,7 @@ async def finalize_node(state: AgentState):
         HumanMessage(content=FINALIZER_PROMPT.format(task=state["task"]))
     )
 
-    llm = ChatOpenAI(model=FINALIZER_LLM, temperature=0)
-    result = await llm.ainvoke(state["messages"])
+    result = await ainvoke_with_policy("finalizer", chat_model, state["messages"])
     state["messages"].append(AIMessage(content=result.content))
 
     return state
@@ -1,24 +1,44 @@
-from typing import Annotated, Dict, Sequence, TypedDict
+from typing import Annotated, Dict, Optional, Sequence, TypedDict
 
 from langchain_core.messages import AIMessage, BaseMessage, SystemMessage, ToolMessage
 from langchain_core.tools import BaseTool
-from langchain_openai import ChatOpenAI
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.message import add_messages
 
+from src.utilities.artifact_store import spill_large_output
+from src.utilities.model_policy import ainvoke_with_policy, chat_model
+
 
 class AgentState(TypedDict):
     messages: Annotated[Sequence[BaseMessage], add_messages]
     tools: Dict[str, BaseTool]
+    # Auto mode: stop and hand over to the planner after this many tool calls
+    max_tool_calls: Optional[int]
+    tool_calls_made: int
+    escalated: bool
 
 
-def process(state: AgentState) -> AgentState:
-    system_prompt = SystemMessage(
-        content="You are a helpful, honest and harmless assistant, do your best to answer the user's query. Depend primarily on the tools available to you."
-    )
+def make_process_node(tools: Sequence[BaseTool]):
+    """Build the LLM node of a graph, its model bound to `tools`.
+
+    The factory lives in the node's closure, every compiled graph keeps its own tools.
+    """
+
+    def build_llm(model: str):
+        # built per model so the node's model policy can fall back
+        return chat_model(model).bind_tools(tools)
+
+    async def process(state: AgentState) -> AgentState:
+        system_prompt = SystemMessage(
+            content="You are a helpful, honest and harmless assistant, do your best to answer the user's query. Depend primarily on the tools available to you."
+        )
+
+        response = await ainvoke_with_policy(
+            "react", build_llm, [system_prompt] + state["messages"]
+        )
+        return {"messages": [response]}
 
-    response = llm.invoke([system_prompt] + state["messages"])
-    return {"messages": [response]}
+    return process
 
 
 async def custom_tool_node(state: AgentState):
@@ -28,13 +48,21 @@ async def custom_tool_node(state: AgentState):
     for tool_call in state["messages"][-1].tool_calls:
         tool = state["tools"][tool_call["name"]]
         observation = await tool.ainvoke(tool_call["args"])
-        result.append(ToolMessage(content=observation, tool_call_id=tool_call["id"]))
+        result.append(
+            ToolMessage(
+                content=spill_large_output(observation), tool_call_id=tool_call["id"]
+            )
+        )
         result.append(
             AIMessage(
                 content=f"Calling tool: `{tool.name}` with Args: `{tool_call['args']}`"
             )
         )
-    return {"messages": result}
+    return {
+        "messages": result,
+        "tool_calls_made": state.get("tool_calls_made", 0)
+        + len(state["messages"][-1].tool_calls),
+    }
 
 
 def should_continue(state: AgentState):
@@ -45,16 +73,27 @@ def should_continue(state: AgentState):
         return "continue"
 
 
-async def build_agent(tools):
-    # Initialize LLM with tools
-    global llm
-    llm = ChatOpenAI(model="gpt-4o", temperature=0).bind_tools(tools)
+def should_escalate(state: AgentState):
+    # the tool call budget is spent and the agent has not answered yet
+    max_tool_calls = state.get("max_tool_calls")
+    if max_tool_calls and state.get("tool_calls_made", 0) >= max_tool_calls:
+        return "escalate"
+    else:
+        return "continue"
+
 
+def escalate(state: AgentState):
+    """Marks the run as too complex for the ReAct agent, the caller continues with the planner."""
+    return {"escalated": True}
+
+
+async def build_agent(tools):
     # Building Graph
     graph = StateGraph(AgentState)
 
-    graph.add_node("process_node", process)
+    graph.add_node("process_node", make_process_node(tools))
     graph.add_node("tools", custom_tool_node)
+    graph.add_node("escalate", escalate)
 
     graph.add_edge(START, "process_node")
     graph.add_conditional_edges(
@@ -62,7 +101,12 @@ async def build_agent(tools):
         path=should_continue,
         path_map={"continue": "tools", "end": END},
     )
-    graph.add_edge("tools", "process_node")
+    graph.add_conditional_edges(
+        source="tools",
+        path=should_escalate,
+        path_map={"continue": "process_node", "escalate": "escalate"},
+    )
+    graph.add_edge("escalate", END)
     graph.add_edge("process_node", END)
 
     return graph.compile()
@@ -0,0 +1,46 @@
+import re
+
+from src.utilities.constants import (
+    ROUTER_LONG_PROMPT_WORDS,
+    ROUTER_PLANNER_KEYWORDS,
+    ROUTER_PLANNER_SCORE_THRESHOLD,
+)
+from src.utilities.prefetch import extract_repo_references
+
+REACT_ROUTE = "react"
+PLANNER_ROUTE = "planner"
+
+
+def route_query(prompt: str) -> tuple[str, str]:
+    """
+    Cheap local classifier deciding which graph should answer the prompt, without any LLM call.
+
+    Each signal of a complex, multi-step task adds to a score: analysis keywords, a long prompt,
+    several questions or chained instructions, and several repositories. Prompts reaching
+    ROUTER_PLANNER_SCORE_THRESHOLD go to the planner, everything else to the ReAct agent.
+
+    Args:
+        prompt (str): The user prompt.
+
+    Returns: Tuple of the route (REACT_ROUTE or PLANNER_ROUTE) and a short reason for logging.
+    """
+
+    text = prompt.lower()
+    signals = []
+
+    keywords = [keyword for keyword in ROUTER_PLANNER_KEYWORDS if keyword in text]
+    if keywords:
+        signals.append(f"keywords {keywords}")
+    if len(text.split()) > ROUTER_LONG_PROMPT_WORDS:
+        signals.append(f"{len(text.split())} words")
+    if text.count("?") > 1:
+        signals.append(f"{text.count('?')} questions")
+    if re.search(r"\b(and then|then|after that|finally|also)\b|;", text):
+        signals.append("chained instructions")
+    if len(extract_repo_references(prompt)) > 1:
+        signals.append("several repositories")
+
+    score = len(signals) + max(len(keywords) - 1, 0)
+    route = PLANNER_ROUTE if score >= ROUTER_PLANNER_SCORE_THRESHOLD else REACT_ROUTE
+
+    return route, f"score {score}: " + (", ".join(signals) or "no complexity signals")
@@ -1,27 +1,247 @@
+import atexit
+import copy
+import fcntl
+import json
 import logging
+import multiprocessing
 import os
+import queue
 import re
+import resource
+import shutil
 import subprocess
+import sys
+import threading
+import time
+import tomllib
+from collections import Counter, defaultdict
+from contextlib import contextmanager
 from pathlib import Path
 
-import requests
-from git import Repo
-from mcp.server.fastmcp import FastMCP
-
 logging.basicConfig(
     level=logging.INFO,
     format="[%(asctime)s] %(levelname)-8s %(message)s",
     datefmt="%m/%d/%y %H:%M:%S",
 )
 
-mcp = FastMCP(name="Git")
+# FastMCP, GitPython and requests are imported lazily: the heavy tool worker processes import this
+# module too, and none of them need those. Tools are collected by `@tool` and registered on the
+# server in `create_server`.
+TOOLS = []
+mcp = None
+
+
+def tool(fn):
+    """Mark `fn` as an MCP tool of the server built by `create_server`."""
+    TOOLS.append(fn)
+    return fn
+
+
+def create_server():
+    from mcp.server.fastmcp import FastMCP
+
+    server = FastMCP(name="Git")
+    for fn in TOOLS:
+        server.add_tool(fn)
+
+    return server
+
+
+def start_warm_standby():
+    """
+    Get the server ready for its first tool call in the background, while the client initializes:
+    start the heavy tool worker processes and import the lazily loaded dependencies.
+    """
+
+    def warm_up():
+        started = time.perf_counter()
+        heavy_tool_pool.start()
+        import git  # noqa: F401
+        import requests  # noqa: F401
+
+        logging.info(f"Warm standby ready in {time.perf_counter() - started:.2f}s.")
+
+    threading.Thread(target=warm_up, name="warm-standby", daemon=True).start()
+
+
+# Cached repository manifests live next to the clones, one file per HEAD sha.
+MANIFEST_CACHE_DIR = "./tmp/.manifests/"
+# Bumped when the content of the manifest changes, older cached manifests are rebuilt
+MANIFEST_VERSION = 2
+README_EXCERPT_CHARS = 2000
+
+LANGUAGE_BY_EXTENSION = {
+    ".py": "Python",
+    ".ipynb": "Jupyter Notebook",
+    ".js": "JavaScript",
+    ".jsx": "JavaScript",
+    ".mjs": "JavaScript",
+    ".ts": "TypeScript",
+    ".tsx": "TypeScript",
+    ".go": "Go",
+    ".rs": "Rust",
+    ".java": "Java",
+    ".kt": "Kotlin",
+    ".scala": "Scala",
+    ".rb": "Ruby",
+    ".php": "PHP",
+    ".cs": "C#",
+    ".c": "C",
+    ".h": "C",
+    ".cc": "C++",
+    ".cpp": "C++",
+    ".hpp": "C++",
+    ".swift": "Swift",
+    ".m": "Objective-C",
+    ".sh": "Shell",
+    ".sql": "SQL",
+    ".html": "HTML",
+    ".css": "CSS",
+    ".scss": "CSS",
+    ".md": "Markdown",
+    ".rst": "reStructuredText",
+    ".yml": "YAML",
+    ".yaml": "YAML",
+    ".toml": "TOML",
+    ".json": "JSON",
+}
+# Documentation and data formats, listed among the languages but left out of the lines of code.
+# Notebooks are too: their line count is that of their JSON.
+NON_CODE_LANGUAGES = {
+    "Jupyter Notebook",
+    "Markdown",
+    "reStructuredText",
+    "YAML",
+    "TOML",
+    "JSON",
+}
+
+MANIFEST_FILES = {
+    "pyproject.toml",
+    "setup.py",
+    "setup.cfg",
+    "requirements.txt",
+    "Pipfile",
+    "package.json",
+    "go.mod",
+    "Cargo.toml",
+    "pom.xml",
+    "build.gradle",
+    "build.gradle.kts",
+    "Gemfile",
+    "composer.json",
+}
+
+# `implementation 'group:artifact:version'` or `testImplementation("group:artifact:version")`
+GRADLE_DEPENDENCY_PATTERN = (
+    r"^\s*(\w*(?:[Ii]mplementation|[Aa]pi|[Cc]ompileOnly|[Rr]untimeOnly))"
+    r"\s*\(?\s*['\"]([^'\"]+)['\"]"
+)
+
+ENTRY_POINT_FILES = {
+    "main.py",
+    "__main__.py",
+    "app.py",
+    "manage.py",
+    "cli.py",
+    "wsgi.py",
+    "asgi.py",
+    "main.go",
+    "main.rs",
+    "index.js",
+    "index.ts",
+    "server.js",
+    "app.js",
+    "Main.java",
+    "Dockerfile",
+    "Makefile",
+}
+
+TEST_DIR_NAMES = {"test", "tests", "__tests__", "spec", "specs", "testing"}
+
+# Shared object pool: a bare repo holding the objects of every clone, which borrow them through
+# git alternates, so forks of the same upstream store their common history once.
+OBJECT_POOL_DIR = "./tmp/.objects/pool.git"
+# Each clone keeps its objects alive with refs under refs/rex/<organization>/<repo>/ in the pool
+OBJECT_POOL_REF_PREFIX = "refs/rex/"
+# Unreachable pool objects younger than this survive a GC, covering fetches still in flight
+OBJECT_POOL_PRUNE_EXPIRE = "1.day.ago"
+
+# Commit-history analytics, one index per repo appended as HEAD moves.
+HISTORY_INDEX_DIR = "./tmp/.history/"
+# Bulk commits (vendoring, reformatting) touching more files than this are left out of co-change pairs.
+MAX_CO_CHANGE_FILES = 30
+# Bumped when the layout of the index changes, older indexes are rebuilt
+HISTORY_INDEX_VERSION = 2
+# Parsed indexes of this process, so tool calls do not reparse the file while HEAD does not move
+_history_indexes = {}
+
+# Heavy tools run in supervised worker processes, see `HeavyToolWorkerPool`.
+HEAVY_TOOL_WORKERS = 2
+# Start the workers when the server starts instead of on the first heavy tool call
+PREFORK_HEAVY_TOOL_WORKERS = True
+HEAVY_TOOL_TIMEOUT_S = 60
+HEAVY_TOOL_MAX_RSS_MB = 1024
+# Workers also get an address space limit of the RSS limit plus this headroom, so one large
+# allocation fails with a MemoryError in the worker before the RSS check can even see it
+HEAVY_TOOL_ADDRESS_SPACE_HEADROOM_MB = 256
+HEAVY_TOOL_MAX_CALLS_PER_WORKER = 50
+MAX_TOOL_OUTPUT_CHARS = 2_000_000
+MAX_SEARCH_MATCHES = 2000
+MAX_REGEX_LENGTH = 500
+# Minimum interval between two progress notifications of a tool call
+PROGRESS_INTERVAL_S = 0.5
+# Phases reported by `git clone --progress`, in order
+CLONE_PHASES = [
+    "Counting objects",
+    "Compressing objects",
+    "Receiving objects",
+    "Resolving deltas",
+]
+CLONE_PROGRESS_PATTERN = re.compile(rf"({'|'.join(CLONE_PHASES)}):\s+(\d+)%")
+
+# A quantified group that itself contains a quantifier, e.g. `(a+)+` or `(\w*\s?)*`.
+NESTED_QUANTIFIER_PATTERN = re.compile(
+    r"\((?:[^()\\]|\\.)*[+*}](?:[^()\\]|\\.)*\)[+*{]"
+)
+# A quantified group with alternatives, e.g. `(a|aa)+`, which backtracks catastrophically when
+# the alternatives overlap. Overlap is not checked, every repeated alternation is rejected.
+QUANTIFIED_ALTERNATION_PATTERN = re.compile(
+    r"\((?:[^()\\]|\\.)*\|(?:[^()\\]|\\.)*\)[+*{]"
+)
+
+# One lock per repo, so a tool call arriving while a warm-up clones the same repo
+# waits for that clone instead of starting a second one. The app starts a server process
+# per session, so the thread lock is backed by a file lock shared by all of them.
+REPO_LOCK_DIR = "./tmp/.locks/"
+_repo_locks = defaultdict(threading.Lock)
+_repo_locks_guard = threading.Lock()
+
 
+@contextmanager
+def get_repo_lock(repo_name: str):
+    """Hold the lock guarding the local clone of the specified repo, across threads and processes."""
 
-def check_if_repo_exists(repo_name: str):
+    with _repo_locks_guard:
+        thread_lock = _repo_locks[repo_name]
+
+    lock_path = Path(REPO_LOCK_DIR + repo_name + ".lock")
+    with thread_lock:
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def check_if_repo_exists(repo_name: str, progress=None):
     """Check if the specified repo exists in the /tmp folder, else persist it.
 
     Args:
         repo_name (str): name of the repo with organization, for example, organization_name/repo_name.
+        progress (callable, optional): Called with (progress, total, message) while cloning.
 
     Returns: None
     """
@@ -29,19 +249,645 @@ def check_if_repo_exists(repo_name: str):
     destination_path = "./tmp/"
     folder_path = Path(destination_path + repo_name)
 
-    if folder_path.is_dir():
-        logging.info(f"The repo '{repo_name}' already exists, skipping clone...")
-    else:
+    with get_repo_lock(repo_name):
+        if folder_path.is_dir():
+            logging.info(f"The repo '{repo_name}' already exists, skipping clone...")
+            return
+
         logging.info(f"Repo '{repo_name}' does not exist, cloning...")
 
+        # clone next to the destination and rename, so an interrupted clone is never mistaken for a repo
+        partial_path = folder_path.with_name(folder_path.name + ".partial")
+        if partial_path.exists():
+            shutil.rmtree(partial_path)
+        # created before fetching, so a concurrent GC already counts the clone as a dependent
+        partial_path.mkdir(parents=True)
+
         repo_url = "https://github.com/" + repo_name
-        subprocess.run(["git", "clone", repo_url, folder_path], check=True)
+        try:
+            clone_from_object_pool(repo_name, repo_url, partial_path, progress)
+            partial_path.rename(folder_path)
+        except BaseException:
+            # a failed clone must not keep counting as a dependent of the object pool
+            shutil.rmtree(partial_path, ignore_errors=True)
+            raise
 
         logging.info(f"Successfully cloned repo: {repo_name}.")
 
+        # post-clone hook: build the manifest while the checkout is warm in the page cache
+        load_or_build_manifest(repo_name)
+
+
+def get_object_pool() -> Path:
+    """Return the path of the shared object pool, creating it on first use."""
+
+    pool_path = Path(OBJECT_POOL_DIR)
+    if not (pool_path / "HEAD").is_file():
+        subprocess.run(
+            ["git", "init", "--quiet", "--bare", str(pool_path)],
+            check=True,
+            stdin=subprocess.DEVNULL,
+        )
+        # objects of every clone depend on the pool, it is only ever collected by `gc_object_pool`
+        subprocess.run(
+            ["git", "-C", str(pool_path), "config", "gc.auto", "0"],
+            check=True,
+            stdin=subprocess.DEVNULL,
+        )
+    return pool_path
+
+
+def clone_from_object_pool(
+    repo_name: str, repo_url: str, destination: Path, progress=None
+):
+    """
+    Clone `repo_url` to `destination`, storing its objects in the shared object pool.
+
+    The repo's branches and tags are first fetched into the pool under its own ref namespace,
+    which only downloads the objects the pool does not have yet, for example, the few commits
+    of a fork on top of an upstream that is already there. The clone then borrows every object
+    from the pool through git alternates and stays a checkout of a few megabytes.
+
+    Args:
+        repo_name (str): name of the repo with organization, for example, organization_name/repo_name.
+        repo_url (str): URL to clone from.
+        destination (Path): Directory of the clone, must be missing or empty.
+        progress (callable, optional): Called with (progress, total, message) while fetching and cloning.
+
+    Returns: None
+    """
+
+    pool_path = get_object_pool()
+    namespace = OBJECT_POOL_REF_PREFIX + repo_name
+    run_git_with_progress(
+        [
+            "git",
+            "-C",
+            str(pool_path),
+            "fetch",
+            "--progress",
+            "--no-tags",
+            repo_url,
+            f"+refs/heads/*:{namespace}/heads/*",
+            f"+refs/tags/*:{namespace}/tags/*",
+        ],
+        f"Fetching {repo_url}",
+        progress,
+        step=0,
+        steps=2,
+    )
+    run_git_with_progress(
+        [
+            "git",
+            "clone",
+            "--progress",
+            "--reference",
+            str(pool_path.resolve()),
+            repo_url,
+            str(destination),
+        ],
+        f"Cloning {repo_url}",
+        progress,
+        step=1,
+        steps=2,
+    )
+
+
+def run_git_with_progress(
+    command: list[str], label: str, progress=None, step: int = 0, steps: int = 1
+):
+    """Run a git command with `--progress` and report the percentage of each of its phases to `progress`.
+
+    Args:
+        command (list[str]): The git command.
+        label (str): Prefix of the progress messages.
+        progress (callable, optional): Called with (progress, total, message).
+        step (int, optional): Index of this command when several report to the same `progress`.
+        steps (int, optional): Number of commands reporting to the same `progress`.
+
+    Returns: None
+    """
+
+    process = subprocess.Popen(
+        command,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+    )
+
+    # git redraws its progress lines with carriage returns
+    lines = []
+    buffer = b""
+    while chunk := process.stderr.read1(4096):
+        *complete, buffer = re.split(rb"[\r\n]", buffer + chunk)
+        for line in complete:
+            line = line.decode("utf-8", errors="ignore").strip()
+            if not line:
+                continue
+            lines = lines[-20:] + [line]
+            match = CLONE_PROGRESS_PATTERN.search(line)
+            if match and progress is not None:
+                phase, percent = match.groups()
+                # one range per command and phase, so the reported progress only increases
+                progress(
+                    (step * len(CLONE_PHASES) + CLONE_PHASES.index(phase)) * 100
+                    + int(percent),
+                    steps * len(CLONE_PHASES) * 100,
+                    f"{label}: {phase} {percent}%",
+                )
+
+    if process.wait() != 0:
+        raise subprocess.CalledProcessError(
+            process.returncode, command, stderr="\n".join(lines)
+        )
+
+
+def gc_object_pool():
+    """
+    Collect the objects of removed clones from the shared object pool.
+
+    A clone is a dependent of the pool while its directory, or its `.partial` directory during a
+    clone, exists under ./tmp; delete the directory to remove a repo. Refs of removed dependents are
+    dropped and the refs of the remaining ones are refreshed from the clones themselves, so objects
+    they fetched later are kept too. Only then is the pool repacked, pruning unreachable objects
+    older than OBJECT_POOL_PRUNE_EXPIRE.
+
+    Returns: Summary of the collection.
+    """
+
+    pool_path = get_object_pool()
+    pool = str(pool_path)
+    refs = subprocess.run(
+        [
+            "git",
+            "-C",
+            pool,
+            "for-each-ref",
+            "--format=%(refname)",
+            OBJECT_POOL_REF_PREFIX,
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.split()
+    repo_names = sorted(
+        {"/".join(ref.split("/")[2:4]) for ref in refs if ref.count("/") >= 4}
+    )
+
+    removed = []
+    for repo_name in repo_names:
+        namespace = OBJECT_POOL_REF_PREFIX + repo_name
+        folder_path = Path("./tmp/" + repo_name)
+
+        # a clone of this repo, in any server process, holds the lock until its directory is in place
+        with get_repo_lock(repo_name):
+            partial_path = folder_path.with_name(folder_path.name + ".partial")
+            if folder_path.is_dir():
+                subprocess.run(
+                    [
+                        "git",
+                        "-C",
+                        pool,
+                        "fetch",
+                        "--quiet",
+                        "--no-tags",
+                        str(folder_path.resolve()),
+                        f"+refs/*:{namespace}/clone/*",
+                    ],
+                    check=True,
+                    stdin=subprocess.DEVNULL,
+                )
+            elif not partial_path.is_dir():
+                removed.append(repo_name)
+                subprocess.run(
+                    ["git", "-C", pool, "update-ref", "--stdin"],
+                    input="".join(
+                        f"delete {ref}\n"
+                        for ref in refs
+                        if ref.startswith(namespace + "/")
+                    ),
+                    check=True,
+                    text=True,
+                )
+
+    size_before = get_directory_size(pool_path)
+    subprocess.run(
+        ["git", "-C", pool, "gc", "--quiet", f"--prune={OBJECT_POOL_PRUNE_EXPIRE}"],
+        check=True,
+        stdin=subprocess.DEVNULL,
+    )
+    size_after = get_directory_size(pool_path)
+
+    summary = (
+        f"Object pool GC: {len(repo_names) - len(removed)} dependents kept, "
+        f"{len(removed)} removed {removed}, "
+        f"{size_before / 2**20:.1f}MB -> {size_after / 2**20:.1f}MB."
+    )
+    logging.info(summary)
+    return summary
+
+
+def get_directory_size(directory: Path) -> int:
+    return sum(path.stat().st_size for path in directory.rglob("*") if path.is_file())
+
+
+def get_head_sha(directory: str) -> str:
+    """Return the HEAD commit sha of the repository at `directory`."""
+    return subprocess.run(
+        ["git", "-C", directory, "rev-parse", "HEAD"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+
+def load_or_build_manifest(repo_name: str) -> dict:
+    """Load the cached manifest for the current HEAD of the repo, building it on a miss.
+
+    Args:
+        repo_name (str): name of the repo with organization, for example, organization_name/repo_name.
+
+    Returns: The manifest as a dictionary.
+    """
+
+    directory = "./tmp/" + repo_name
+    head_sha = get_head_sha(directory)
+    cache_path = Path(MANIFEST_CACHE_DIR + repo_name) / f"{head_sha}.json"
+
+    if cache_path.is_file():
+        manifest = json.loads(cache_path.read_text(encoding="utf-8"))
+        if manifest.get("version") == MANIFEST_VERSION:
+            logging.info(f"Using cached manifest for '{repo_name}' at {head_sha[:12]}.")
+            return manifest
+
+    logging.info(f"Building manifest for '{repo_name}' at {head_sha[:12]}...")
+    manifest = build_repo_manifest(directory)
+    manifest["repo_name"] = repo_name
+    manifest["head_sha"] = head_sha
+    manifest["version"] = MANIFEST_VERSION
+
+    # stale manifests belong to older HEADs, only the current one is kept
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    for stale in cache_path.parent.glob("*.json"):
+        stale.unlink()
+    tmp_path = cache_path.with_suffix(".json.tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    tmp_path.replace(cache_path)
+
+    return manifest
+
+
+def build_repo_manifest(directory: str) -> dict:
+    """Walk the checkout once and collect everything needed to describe the repository.
+
+    Args:
+        directory (str): Path of the local checkout.
+
+    Returns: Dictionary with languages, manifest files, dependencies, entry points, test
+        directories, README excerpt and size stats.
+    """
+
+    languages = Counter()
+    language_lines = Counter()
+    manifest_files = []
+    entry_points = []
+    test_dirs = []
+    readme_path = None
+    total_files = 0
+    total_bytes = 0
+    total_lines = 0
+
+    ignore_list = {".git", "node_modules", ".venv", "venv", "__pycache__", "vendor"}
+
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if d not in ignore_list)
+        rel_root = os.path.relpath(root, directory)
+        depth = 0 if rel_root == "." else rel_root.count(os.sep) + 1
+
+        for d in dirs:
+            if d.lower() in TEST_DIR_NAMES:
+                test_dirs.append(os.path.normpath(os.path.join(rel_root, d)))
+
+        for file in sorted(files):
+            file_path = os.path.join(root, file)
+            rel_path = os.path.normpath(os.path.join(rel_root, file))
+            try:
+                size = os.path.getsize(file_path)
+            except OSError:
+                continue
+
+            total_files += 1
+            total_bytes += size
+
+            if file in MANIFEST_FILES or re.fullmatch(r"requirements.*\.txt", file):
+                manifest_files.append(rel_path)
+            if file in ENTRY_POINT_FILES and depth <= 2:
+                entry_points.append(rel_path)
+            if depth == 0 and file.lower().startswith("readme") and readme_path is None:
+                readme_path = file_path
+
+            language = LANGUAGE_BY_EXTENSION.get(os.path.splitext(file)[1].lower())
+            if language is None:
+                continue
+            try:
+                with open(file_path, "rb") as f:
+                    lines = sum(
+                        chunk.count(b"\n")
+                        for chunk in iter(lambda: f.read(1 << 16), b"")
+                    )
+            except OSError:
+                continue
+            languages[language] += 1
+            language_lines[language] += lines
+            if language not in NON_CODE_LANGUAGES:
+                total_lines += lines
+
+    dependencies = {}
+    for rel_path in manifest_files:
+        try:
+            parsed = parse_manifest_dependencies(os.path.join(directory, rel_path))
+        except Exception as e:
+            logging.error(f"Could not parse {rel_path}: {e}")
+            continue
+        if parsed:
+            dependencies[rel_path] = parsed
+            entry_points.extend(parsed.pop("entry_points", []))
+
+    readme_excerpt = ""
+    if readme_path is not None:
+        with open(readme_path, "r", encoding="utf-8", errors="ignore") as f:
+            readme_excerpt = f.read(README_EXCERPT_CHARS).strip()
+
+    return {
+        "languages": [
+            {"language": language, "files": count, "lines": language_lines[language]}
+            for language, count in sorted(
+                languages.items(), key=lambda item: -language_lines[item[0]]
+            )
+        ],
+        "manifest_files": manifest_files,
+        "dependencies": dependencies,
+        "entry_points": entry_points,
+        "test_directories": test_dirs,
+        "readme_excerpt": readme_excerpt,
+        "size": {
+            "files": total_files,
+            "bytes": total_bytes,
+            "lines_of_code": total_lines,
+        },
+    }
+
+
+def parse_manifest_dependencies(file_path: str) -> dict:
+    """Extract the declared dependencies (and entry points, where declared) from a manifest file.
+
+    Args:
+        file_path (str): Path of the manifest file.
+
+    Returns: Dictionary of dependency groups, empty if the format is not understood.
+    """
+
+    file = os.path.basename(file_path)
+    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+        content = f.read()
+
+    if file == "pyproject.toml":
+        data = tomllib.loads(content)
+        project = data.get("project", {})
+        poetry = data.get("tool", {}).get("poetry", {})
+        result = {
+            "dependencies": project.get("dependencies", [])
+            + [name for name in poetry.get("dependencies", {}) if name != "python"],
+            "optional_dependencies": {
+                **project.get("optional-dependencies", {}),
+                **{
+                    group: list(spec.get("dependencies", {}))
+                    for group, spec in poetry.get("group", {}).items()
+                },
+            },
+        }
+        scripts = {**project.get("scripts", {}), **poetry.get("scripts", {})}
+        if scripts:
+            result["entry_points"] = [
+                f"{name} = {target}" for name, target in scripts.items()
+            ]
+        return result
+
+    if file.startswith("requirements") and file.endswith(".txt"):
+        return {
+            "dependencies": [
+                line.split("#")[0].strip()
+                for line in content.splitlines()
+                if line.strip() and not line.strip().startswith(("#", "-"))
+            ]
+        }
+
+    if file in {"package.json", "composer.json"}:
+        data = json.loads(content)
+        result = {
+            "dependencies": list(data.get("dependencies", data.get("require", {}))),
+            "dev_dependencies": list(
+                data.get("devDependencies", data.get("require-dev", {}))
+            ),
+        }
+        entry_points = [data["main"]] if isinstance(data.get("main"), str) else []
+        bin_field = data.get("bin")
+        if isinstance(bin_field, str):
+            entry_points.append(bin_field)
+        elif isinstance(bin_field, dict):
+            entry_points.extend(bin_field.values())
+        if entry_points:
+            result["entry_points"] = entry_points
+        return result
+
+    if file == "go.mod":
+        return {
+            "dependencies": re.findall(
+                r"^\s*(?:require\s+)?([\w.\-]+\.[\w.\-/]+)\s+v[\w.\-+]+",
+                content,
+                flags=re.MULTILINE,
+            )
+        }
+
+    if file == "Cargo.toml":
+        data = tomllib.loads(content)
+        return {
+            "dependencies": list(data.get("dependencies", {})),
+            "dev_dependencies": list(data.get("dev-dependencies", {})),
+        }
+
+    if file == "Gemfile":
+        return {
+            "dependencies": re.findall(
+                r"^\s*gem\s+['\"]([^'\"]+)", content, re.MULTILINE
+            )
+        }
+
+    if file == "setup.py":
+        return parse_setup_py(content)
+
+    if file == "setup.cfg":
+        import configparser
+
+        config = configparser.ConfigParser(interpolation=None)
+        config.read_string(content)
+
+        def values(section, option):
+            return [
+                line.split("#")[0].strip()
+                for line in config.get(section, option, fallback="").splitlines()
+                if line.split("#")[0].strip()
+            ]
+
+        result = {
+            "dependencies": values("options", "install_requires"),
+            "optional_dependencies": {
+                extra: values("options.extras_require", extra)
+                for extra in (
+                    config.options("options.extras_require")
+                    if config.has_section("options.extras_require")
+                    else []
+                )
+            },
+        }
+        scripts = values("options.entry_points", "console_scripts")
+        if scripts:
+            result["entry_points"] = scripts
+        return result
+
+    if file == "Pipfile":
+        data = tomllib.loads(content)
+        return {
+            "dependencies": list(data.get("packages", {})),
+            "dev_dependencies": list(data.get("dev-packages", {})),
+        }
+
+    if file == "pom.xml":
+        import xml.etree.ElementTree as ElementTree
+
+        root = ElementTree.fromstring(content)
+        # elements are namespaced by the POM schema, usually
+        namespace = (
+            root.tag[: root.tag.index("}") + 1] if root.tag.startswith("{") else ""
+        )
+        result = {"dependencies": [], "dev_dependencies": []}
+        # dependencies of the project itself, not those of dependencyManagement or plugins
+        for dependency in root.findall(
+            f"{namespace}dependencies/{namespace}dependency"
+        ):
+            name = ":".join(
+                dependency.findtext(f"{namespace}{field}", "").strip()
+                for field in ("groupId", "artifactId")
+            )
+            scope = dependency.findtext(f"{namespace}scope", "").strip()
+            result["dev_dependencies" if scope == "test" else "dependencies"].append(
+                name
+            )
+        return result
+
+    if file in {"build.gradle", "build.gradle.kts"}:
+        result = {"dependencies": [], "dev_dependencies": []}
+        for configuration, name in re.findall(
+            GRADLE_DEPENDENCY_PATTERN, content, flags=re.MULTILINE
+        ):
+            # group:artifact, without the version
+            name = ":".join(name.split(":")[:2])
+            group = (
+                "dev_dependencies"
+                if configuration.startswith("test")
+                else "dependencies"
+            )
+            result[group].append(name)
+        return result
+
+    return {}
+
+
+def parse_setup_py(content: str) -> dict:
+    """Read the literal dependency lists passed to `setup()` in a setup.py, without running it.
+
+    Returns: Dictionary of dependency groups, empty where they are not literals.
+    """
+
+    import ast
+
+    result = {}
+    for node in ast.walk(ast.parse(content)):
+        if not (
+            isinstance(node, ast.Call)
+            and getattr(node.func, "id", getattr(node.func, "attr", None)) == "setup"
+        ):
+            continue
+        for keyword in node.keywords:
+            try:
+                value = ast.literal_eval(keyword.value)
+            except ValueError:
+                # computed, like `install_requires=read_requirements()`
+                continue
+            if keyword.arg == "install_requires" and isinstance(value, (list, tuple)):
+                result["dependencies"] = list(value)
+            elif keyword.arg == "extras_require" and isinstance(value, dict):
+                result["optional_dependencies"] = {
+                    extra: list(requirements) for extra, requirements in value.items()
+                }
+            elif keyword.arg == "entry_points" and isinstance(value, dict):
+                scripts = value.get("console_scripts", [])
+                if scripts:
+                    result["entry_points"] = list(scripts)
+
+    return result
+
+
+@tool
+async def get_repo_manifest(repo_name: str):
+    """
+    Useful as the FIRST call for any question about a repository. Cheap, cached overview of the repo:
+    language breakdown with lines of code, manifest files with their parsed dependencies, likely entry points,
+    test directories, an excerpt of the top-level README and size stats.
+
+    Args:
+        repo_name (str): name of the repo with organization, for example, organization_name/repo_name.
+
+    Returns: The repository manifest as a JSON string.
+    """
+
+    # utility function to check and update repo in ./tmp directory
+    await run_with_progress(check_if_repo_exists, repo_name)
+
+    return json.dumps(await run_in_thread(load_or_build_manifest, repo_name), indent=2)
+
+
+def warm_up_repo_sync(repo_name: str, progress=None):
+    """Clone the repo and build its manifest and history index, the blocking part of `warm_up_repo`."""
+    check_if_repo_exists(repo_name, progress)
+    load_or_build_manifest(repo_name)
+    update_history_index(repo_name, progress)
+
 
-@mcp.tool()
-def get_all_repo_contents(repo_name: str, file_extensions=None):
+@tool
+async def warm_up_repo(repo_name: str):
+    """
+    Internal tool used by the client to prefetch a repository while the agent is still planning.
+    Clones the repo and builds its manifest off the event loop, so other tool calls keep being served.
+
+    Args:
+        repo_name (str): name of the repo with organization, for example, organization_name/repo_name.
+
+    Returns: Status message of the warm-up.
+    """
+
+    try:
+        await run_with_progress(warm_up_repo_sync, repo_name)
+    except Exception as e:
+        logging.error(f"Warm-up of '{repo_name}' failed: {e}")
+        return f"Warm-up of '{repo_name}' failed: {e}"
+
+    return f"Repo '{repo_name}' is ready."
+
+
+@tool
+async def get_all_repo_contents(repo_name: str, file_extensions=None):
     """
     Useful to get all the content of every files in the repository.
     Recursively reads all files in the given repo directory and returns their combined contents as a string.
@@ -55,12 +901,28 @@ def get_all_repo_contents(repo_name: str, file_extensions=None):
     """
 
     # utility function to check and update repo in ./tmp directory
-    check_if_repo_exists(repo_name)
+    await run_with_progress(check_if_repo_exists, repo_name)
 
-    result = ""
-    directory = "./tmp/" + repo_name
+    return await run_with_progress(
+        run_heavy_tool,
+        "read_repo_contents",
+        directory="./tmp/" + repo_name,
+        file_extensions=file_extensions,
+    )
 
+
+def read_repo_contents(
+    directory: str, file_extensions, time_budget_s: float, progress=None
+):
+    """Worker side of `get_all_repo_contents`.
+
+    Returns: Tuple of (status, reason, combined file contents).
+    """
+
+    deadline = time.monotonic() + time_budget_s
+    last_report = time.monotonic()
     all_contents = []
+    total_chars = 0
     ignore_list = {".git"}
 
     for root, dirs, files in os.walk(directory):
@@ -69,21 +931,39 @@ def get_all_repo_contents(repo_name: str, file_extensions=None):
 
         for file in files:
             if file_extensions is None or os.path.splitext(file)[1] in file_extensions:
+                if time.monotonic() > deadline:
+                    return "partial", "time limit reached", "\n".join(all_contents)
+
                 file_path = os.path.join(root, file)
                 try:
                     with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                        content = f.read()
-                        all_contents.append(
-                            f"\n# File: {os.path.relpath(file_path, directory)}\n{content}"
-                        )
+                        content = f.read(MAX_TOOL_OUTPUT_CHARS - total_chars + 1)
                 except Exception as e:
-                    print(f"Skipping {file_path}: {e}")
+                    logging.error(f"Skipping {file_path}: {e}")
+                    continue
 
-    return "\n".join(all_contents)
-
-
-@mcp.tool()
-def file_content_parser(repo_name: str, filename: str):
+                all_contents.append(
+                    f"\n# File: {os.path.relpath(file_path, directory)}\n{content}"
+                )
+                total_chars += len(all_contents[-1])
+                if progress and time.monotonic() - last_report > PROGRESS_INTERVAL_S:
+                    last_report = time.monotonic()
+                    progress(
+                        progress=len(all_contents),
+                        message=f"Read {len(all_contents)} files, {total_chars:,} characters",
+                    )
+                if total_chars > MAX_TOOL_OUTPUT_CHARS:
+                    return (
+                        "partial",
+                        f"output limit of {MAX_TOOL_OUTPUT_CHARS} characters reached",
+                        "\n".join(all_contents)[:MAX_TOOL_OUTPUT_CHARS],
+                    )
+
+    return "complete", None, "\n".join(all_contents)
+
+
+@tool
+async def file_content_parser(repo_name: str, filename: str):
     """Retrieve and fetch contents of the specifiled file.
 
     Args:
@@ -94,10 +974,12 @@ def file_content_parser(repo_name: str, filename: str):
     """
 
     # utility function to check and update repo in ./tmp directory
-    check_if_repo_exists(repo_name)
+    await run_with_progress(check_if_repo_exists, repo_name)
 
-    return search_and_read_all_files_safe(
-        repo_root="./tmp/" + repo_name, filename=filename
+    return await run_in_thread(
+        search_and_read_all_files_safe,
+        repo_root="./tmp/" + repo_name,
+        filename=filename,
     )
 
 
@@ -149,8 +1031,8 @@ def search_and_read_all_files_safe(repo_root: str, filename: str) -> str:
     return "\n".join(result_parts)
 
 
-@mcp.tool()
-def get_repo_structure(repo_name: str):
+@tool
+async def get_repo_structure(repo_name: str):
     """Get the directory structure of the specified repository.
 
     Args:
@@ -160,7 +1042,7 @@ def get_repo_structure(repo_name: str):
     """
 
     # utility function to check and update repo in ./tmp directory
-    check_if_repo_exists(repo_name)
+    await run_with_progress(check_if_repo_exists, repo_name)
 
     result = ""
     directory = "./tmp/" + repo_name
@@ -181,8 +1063,10 @@ def get_repo_structure(repo_name: str):
     return result
 
 
-@mcp.tool()
-def code_search(repo_name: str, search_pattern: str) -> str:
+@tool
+async def code_search(
+    repo_name: str, search_pattern: str, max_matches: int = MAX_SEARCH_MATCHES
+) -> str:
     """Find all occurances of a particular string pattern within the repo.
 
     You can customize the pattern_to_search variable to match specific code patterns or functions. For example:
@@ -192,22 +1076,88 @@ def code_search(repo_name: str, search_pattern: str) -> str:
     Args:
         repo_name (str): name of the repo with organization, for example, organization_name/repo_name.
         search_pattern (str): Pattern to search for in the repository.
+        max_matches (int, optional): Stop the search after this many matches, set it low when a few hits are enough.
 
     Returns: List of all occurences of the specified search pattern from the repository as a string.
     """
 
+    rejection = check_regex_complexity(search_pattern)
+    if rejection:
+        return format_heavy_tool_result("aborted", rejection, None)
+
     # utility function to check and update repo in ./tmp directory
-    check_if_repo_exists(repo_name)
+    await run_with_progress(check_if_repo_exists, repo_name)
+
+    return await run_with_progress(
+        run_heavy_tool,
+        "search_repo",
+        directory="./tmp/" + repo_name,
+        search_pattern=search_pattern,
+        max_matches=min(max_matches, MAX_SEARCH_MATCHES),
+    )
 
-    results = []
-    directory = "./tmp/" + repo_name
 
+def check_regex_complexity(search_pattern: str):
+    """Reject patterns that are invalid or prone to catastrophic backtracking.
+
+    Returns: The reason for rejecting the pattern, None if it is safe to run.
+    """
+
+    if len(search_pattern) > MAX_REGEX_LENGTH:
+        return f"search pattern is longer than {MAX_REGEX_LENGTH} characters"
+    if NESTED_QUANTIFIER_PATTERN.search(search_pattern):
+        return "search pattern has nested quantifiers, which can backtrack catastrophically; simplify it"
+    if QUANTIFIED_ALTERNATION_PATTERN.search(search_pattern):
+        return "search pattern repeats a group of alternatives, which can backtrack catastrophically; simplify it"
+    try:
+        re.compile(search_pattern)
+    except re.error as e:
+        return f"invalid search pattern: {e}"
+
+    return None
+
+
+def search_repo(
+    directory: str,
+    search_pattern: str,
+    time_budget_s: float,
+    max_matches: int = MAX_SEARCH_MATCHES,
+    progress=None,
+):
+    """Worker side of `code_search`, streaming matches to `progress` as they are found.
+
+    Returns: Tuple of (status, reason, matches as a string).
+    """
+
+    deadline = time.monotonic() + time_budget_s
+    last_report = time.monotonic()
+    files_scanned = 0
+    new_matches = []
+    results = []
     regex = re.compile(search_pattern)
-    # regex = re.compile(r"^\s*def\s+\w+\s*\(")
+
+    def report(force: bool = False):
+        nonlocal last_report
+        if progress is None:
+            return
+        if not force and time.monotonic() - last_report < PROGRESS_INTERVAL_S:
+            return
+        last_report = time.monotonic()
+        message = f"Scanned {files_scanned} files, {len(results)} matches so far"
+        if new_matches:
+            message += ":\n" + "\n".join(new_matches)
+            new_matches.clear()
+        progress(progress=files_scanned, message=message)
 
     for root, _, files in os.walk(directory):
         for file in files:
             if file.endswith(".py"):
+                if time.monotonic() > deadline:
+                    return "partial", "time limit reached", str(results)
+
+                files_scanned += 1
+                report()
+
                 file_path = os.path.join(root, file)
                 try:
                     with open(file_path, "r", encoding="utf-8") as f:
@@ -220,14 +1170,289 @@ def code_search(repo_name: str, search_pattern: str) -> str:
                                         "content": line.strip(),
                                     }
                                 )
+                                new_matches.append(
+                                    f"{os.path.relpath(file_path, directory)}:{line_no}: {line.strip()[:200]}"
+                                )
+                                # the first hit goes out right away, later ones are batched
+                                report(force=len(results) == 1)
+                                if len(results) >= max_matches:
+                                    return (
+                                        "partial",
+                                        f"stopped after {max_matches} matches",
+                                        str(results),
+                                    )
                 except Exception as e:
                     logging.error(f"Error reading {file_path}: {e}")
 
-    return str(results)
+    return "complete", None, str(results)
+
+
+# Functions the worker processes are allowed to run, by name.
+HEAVY_TOOLS = {
+    "read_repo_contents": read_repo_contents,
+    "search_repo": search_repo,
+}
+
+
+def heavy_tool_worker(conn, max_rss_mb: float):
+    """Entry point of a worker process: run heavy tool requests from `conn` until it is closed."""
+
+    # stdout carries the MCP stdio transport of the parent, never write to it
+    sys.stdout = sys.stderr
+
+    limit = int((max_rss_mb + HEAVY_TOOL_ADDRESS_SPACE_HEADROOM_MB) * 2**20)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+
+        name, kwargs = request
+        try:
+            response = HEAVY_TOOLS[name](
+                **kwargs, progress=lambda **report: conn.send(("progress", report))
+            )
+        except MemoryError:
+            response = ("aborted", "memory limit exceeded", None)
+        except Exception as e:
+            response = ("aborted", f"{type(e).__name__}: {e}", None)
+        conn.send(("result", response))
+
+
+class HeavyToolWorker:
+    """A single worker process and the pipe used to talk to it."""
+
+    def __init__(self, context, max_rss_mb: float):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=heavy_tool_worker, args=(child_conn, max_rss_mb), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.calls = 0
+
+    def rss_mb(self) -> float:
+        """Resident memory of the worker in MB, 0 where /proc is not available."""
+        try:
+            with open(f"/proc/{self.process.pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            pass
+        return 0
+
+    def stop(self, kill: bool = False):
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+        self.process.join(timeout=5)
+        self.conn.close()
+
+
+class HeavyToolWorkerPool:
+    """
+    Pool of supervised worker processes for tools that can blow up on large repos or bad patterns.
+
+    Every call gets a wall-clock timeout and an RSS limit; a worker breaking either is killed and
+    replaced, and the caller gets an "aborted" result instead of a hung or crashed server.
+    Workers are also recycled after a fixed number of calls to bound memory fragmentation.
+    """
+
+    def __init__(
+        self,
+        size: int = HEAVY_TOOL_WORKERS,
+        timeout_s: float = HEAVY_TOOL_TIMEOUT_S,
+        max_rss_mb: float = HEAVY_TOOL_MAX_RSS_MB,
+        max_calls: int = HEAVY_TOOL_MAX_CALLS_PER_WORKER,
+    ):
+        self.size = size
+        self.timeout_s = timeout_s
+        self.max_rss_mb = max_rss_mb
+        self.max_calls = max_calls
+        # spawn, not fork: the server process runs threads (warm-ups) and an event loop
+        self._context = multiprocessing.get_context("spawn")
+        self._idle = queue.Queue()
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        with self._start_lock:
+            if self._started:
+                return
+            for _ in range(self.size):
+                self._idle.put(HeavyToolWorker(self._context, self.max_rss_mb))
+            self._started = True
+            logging.info(f"Started {self.size} heavy tool workers.")
+
+    def close(self):
+        while not self._idle.empty():
+            self._idle.get_nowait().stop()
+
+    def run(self, name: str, progress=None, **kwargs):
+        """Run the heavy tool `name` in a worker process.
+
+        Args:
+            name (str): Key of HEAVY_TOOLS.
+            progress (callable, optional): Receives the progress reports of the tool as keyword arguments.
+
+        Returns: Tuple of (status, reason, result), status being "complete", "partial" or "aborted".
+        """
+
+        self.start()
+        worker = self._idle.get()
+        reason = None
+        response = None
+        try:
+            # leave the tool some headroom to return a partial result before the hard kill
+            worker.conn.send((name, {**kwargs, "time_budget_s": self.timeout_s * 0.8}))
+            deadline = time.monotonic() + self.timeout_s
+
+            while reason is None and response is None:
+                if worker.conn.poll(0.1):
+                    kind, payload = worker.conn.recv()
+                    if kind == "result":
+                        response = payload
+                    elif progress is not None:
+                        progress(**payload)
+                elif not worker.process.is_alive():
+                    reason = f"worker exited with code {worker.process.exitcode}"
+                elif time.monotonic() > deadline:
+                    reason = f"time limit of {self.timeout_s}s exceeded"
+                elif worker.rss_mb() > self.max_rss_mb:
+                    reason = f"memory limit of {self.max_rss_mb}MB exceeded"
+        except (EOFError, OSError) as e:
+            reason = f"lost connection to worker: {e}"
+        finally:
+            # whatever went wrong, the pool never loses a worker: one that did not deliver
+            # its result is in an unknown state and is replaced
+            if response is None:
+                worker.stop(kill=True)
+                worker = HeavyToolWorker(self._context, self.max_rss_mb)
+            else:
+                worker.calls += 1
+                if worker.calls >= self.max_calls:
+                    logging.info(
+                        f"Recycling heavy tool worker after {worker.calls} calls."
+                    )
+                    worker.stop()
+                    worker = HeavyToolWorker(self._context, self.max_rss_mb)
+            self._idle.put(worker)
+
+        if reason is not None:
+            logging.error(f"Aborting heavy tool '{name}': {reason}.")
+            return "aborted", reason, None
+
+        return response
+
+
+heavy_tool_pool = HeavyToolWorkerPool()
+atexit.register(heavy_tool_pool.close)
+
+
+def run_heavy_tool(name: str, progress=None, **kwargs) -> str:
+    """Run a heavy tool in the worker pool and format its result for the agent."""
+    return format_heavy_tool_result(
+        *heavy_tool_pool.run(name, progress=progress, **kwargs)
+    )
+
+
+async def run_in_thread(fn, *args, **kwargs):
+    """Run the blocking `fn` in a worker thread, keeping the event loop free for other requests."""
+
+    import anyio
+
+    return await anyio.to_thread.run_sync(lambda: fn(*args, **kwargs))
 
 
-@mcp.tool()
-def get_recent_commits_with_diffs(repo_name: str, num_commits: int = 5):
+async def run_with_progress(fn, *args, **kwargs):
+    """
+    Run the blocking `fn` in a thread, relaying its progress reports to the MCP client.
+
+    `fn` gets a `progress(progress, total=None, message=None)` callback. Reports are throttled to
+    one per PROGRESS_INTERVAL_S and sent both as a progress notification, for clients that passed
+    a progress token, and as an info log message, which carries the text of partial results.
+    Outside of a request, for example when called from a script, they are dropped.
+
+    The callback never waits for the event loop: `fn` may hold a repo lock that a request
+    on the loop is waiting for. Reports are queued and sent by a task on the loop, in order.
+    """
+
+    import asyncio
+
+    ctx = None
+    if mcp is not None:
+        try:
+            ctx = mcp.get_context()
+            ctx.request_context
+        except (LookupError, ValueError):
+            ctx = None
+    if ctx is None:
+        return await run_in_thread(
+            fn,
+            *args,
+            progress=lambda progress, total=None, message=None: None,
+            **kwargs,
+        )
+
+    loop = asyncio.get_running_loop()
+    reports = asyncio.Queue()
+
+    async def relay():
+        while (report := await reports.get()) is not None:
+            progress, total, message = report
+            try:
+                await ctx.report_progress(progress, total, message)
+                if message:
+                    await ctx.info(message)
+            except Exception as e:
+                logging.debug(f"Dropping progress notification: {e}")
+
+    last_report = 0.0
+
+    def report(progress, total=None, message=None):
+        nonlocal last_report
+        # a report listing new matches is never dropped, they are not repeated later
+        if message is None or "\n" not in message:
+            if time.monotonic() - last_report < PROGRESS_INTERVAL_S:
+                return
+        last_report = time.monotonic()
+        try:
+            loop.call_soon_threadsafe(reports.put_nowait, (progress, total, message))
+        except RuntimeError:
+            # the event loop is closed, the request is gone
+            pass
+
+    relay_task = asyncio.create_task(relay())
+    try:
+        result = await run_in_thread(fn, *args, progress=report, **kwargs)
+        # deliver the last reports before the result
+        reports.put_nowait(None)
+        await relay_task
+        return result
+    finally:
+        relay_task.cancel()
+
+
+def format_heavy_tool_result(status: str, reason, result) -> str:
+    """Return complete results as-is, and partial or aborted ones as a structured JSON string."""
+
+    if status == "complete":
+        return result
+
+    return json.dumps({"status": status, "reason": reason, "result": result})
+
+
+@tool
+async def get_recent_commits_with_diffs(repo_name: str, num_commits: int = 5):
     """
     Retrieves recent commit messages along with their diffs from a local Git repository.
 
@@ -239,11 +1464,17 @@ def get_recent_commits_with_diffs(repo_name: str, num_commits: int = 5):
     """
 
     # utility function to check and update repo in ./tmp directory
-    check_if_repo_exists(repo_name)
+    await run_with_progress(check_if_repo_exists, repo_name)
+
+    return await run_in_thread(read_recent_commits, "./tmp/" + repo_name, num_commits)
 
-    directory = "./tmp/" + repo_name
+
+def read_recent_commits(directory: str, num_commits: int) -> str:
+    """Blocking part of `get_recent_commits_with_diffs`."""
 
     try:
+        from git import Repo
+
         repo = Repo(directory)
         commits = list(repo.iter_commits("HEAD", max_count=num_commits))
 
@@ -265,7 +1496,301 @@ def get_recent_commits_with_diffs(repo_name: str, num_commits: int = 5):
         return "Could not fetch commits"
 
 
-@mcp.tool()
+def update_history_index(repo_name: str, progress=None) -> dict:
+    """
+    Bring the commit-history index of the repo up to date with HEAD.
+
+    The index is built in a single `git log --numstat` pass and afterwards only the commits
+    between the last indexed sha and HEAD are read and appended.
+
+    Args:
+        repo_name (str): name of the repo with organization, for example, organization_name/repo_name.
+        progress (callable, optional): Called with (progress, total, message) while indexing.
+
+    Returns: The index with per-file churn, per-author stats and co-change pair counts.
+    """
+
+    directory = "./tmp/" + repo_name
+    index_path = Path(HISTORY_INDEX_DIR + repo_name + ".json")
+
+    with get_repo_lock(repo_name + ":history"):
+        head_sha = get_head_sha(directory)
+        index = _history_indexes.get(repo_name)
+        if index is None and index_path.is_file():
+            index = json.loads(index_path.read_text(encoding="utf-8"))
+            if index.get("version") != HISTORY_INDEX_VERSION:
+                index = None
+        if index is not None:
+            _history_indexes[repo_name] = index
+            if index["last_sha"] == head_sha:
+                return index
+            # callers may still be reading the cached index, update a copy of it
+            index = copy.deepcopy(index)
+
+        revision_range = "HEAD"
+        if index is not None:
+            is_ancestor = subprocess.run(
+                ["git", "-C", directory, "merge-base", "--is-ancestor"]
+                + [index["last_sha"], head_sha],
+                capture_output=True,
+            )
+            if is_ancestor.returncode == 0:
+                revision_range = f"{index['last_sha']}..HEAD"
+            else:
+                logging.info(f"History of '{repo_name}' was rewritten, rebuilding...")
+                index = None
+
+        if index is None:
+            index = {
+                "version": HISTORY_INDEX_VERSION,
+                "last_sha": None,
+                "commits": 0,
+                "files": {},
+                "authors": {},
+                "co_changes": {},
+            }
+
+        logging.info(f"Indexing history of '{repo_name}' ({revision_range})...")
+        for count, commit in enumerate(
+            iter_numstat_commits(directory, revision_range), start=1
+        ):
+            add_commit_to_history_index(index, commit)
+            if progress is not None:
+                progress(count, None, f"Indexed {count} commits of '{repo_name}'")
+        index["last_sha"] = head_sha
+
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = index_path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(index), encoding="utf-8")
+        tmp_path.replace(index_path)
+        _history_indexes[repo_name] = index
+
+    return index
+
+
+def iter_numstat_commits(directory: str, revision_range: str):
+    """Stream the commits of `git log --numstat`, without holding the whole log in memory.
+
+    Yields: Dictionaries with timestamp, author and the list of (path, additions, deletions).
+    """
+
+    process = subprocess.Popen(
+        ["git", "-C", directory, "log", "--numstat", "--no-renames"]
+        + ["--format=%x1e%H%x1f%at%x1f%aN", revision_range],
+        stdout=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+        errors="ignore",
+    )
+
+    commit = None
+    for line in process.stdout:
+        line = line.rstrip("\n")
+        if line.startswith("\x1e"):
+            if commit is not None:
+                yield commit
+            _, timestamp, author = line[1:].split("\x1f", 2)
+            commit = {"timestamp": int(timestamp), "author": author, "files": []}
+        elif line and commit is not None:
+            additions, deletions, path = line.split("\t", 2)
+            # binary files are reported with "-" instead of line counts
+            commit["files"].append(
+                (
+                    path,
+                    int(additions) if additions.isdigit() else 0,
+                    int(deletions) if deletions.isdigit() else 0,
+                )
+            )
+    if commit is not None:
+        yield commit
+
+    process.wait()
+
+
+def add_commit_to_history_index(index: dict, commit: dict):
+    """Fold a single commit into the aggregates of the history index."""
+
+    author = commit["author"]
+    timestamp = commit["timestamp"]
+    index["commits"] += 1
+
+    author_stats = index["authors"].setdefault(
+        author, {"commits": 0, "lines_changed": 0, "last_commit_ts": 0}
+    )
+    author_stats["commits"] += 1
+    author_stats["last_commit_ts"] = max(author_stats["last_commit_ts"], timestamp)
+
+    for path, additions, deletions in commit["files"]:
+        file_stats = index["files"].setdefault(
+            path,
+            {
+                "commits": 0,
+                "additions": 0,
+                "deletions": 0,
+                "last_commit_ts": 0,
+                "authors": {},
+            },
+        )
+        file_stats["commits"] += 1
+        file_stats["additions"] += additions
+        file_stats["deletions"] += deletions
+        file_stats["last_commit_ts"] = max(file_stats["last_commit_ts"], timestamp)
+        # per-file author stats are [commits, lines changed, last commit timestamp]
+        file_author = file_stats["authors"].setdefault(author, [0, 0, 0])
+        file_author[0] += 1
+        file_author[1] += additions + deletions
+        file_author[2] = max(file_author[2], timestamp)
+        author_stats["lines_changed"] += additions + deletions
+
+    paths = sorted({path for path, _, _ in commit["files"]})
+    if len(paths) <= MAX_CO_CHANGE_FILES:
+        for i, path_a in enumerate(paths):
+            for path_b in paths[i + 1 :]:
+                key = f"{path_a}\t{path_b}"
+                index["co_changes"][key] = index["co_changes"].get(key, 0) + 1
+
+
+def format_table(headers: list, rows: list) -> str:
+    """Format rows as a compact markdown table."""
+
+    lines = [
+        "| " + " | ".join(headers) + " |",
+        "|" + "|".join("---" for _ in headers) + "|",
+    ]
+    lines.extend("| " + " | ".join(str(cell) for cell in row) + " |" for row in rows)
+    return "\n".join(lines)
+
+
+def format_date(timestamp: int) -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime(timestamp))
+
+
+@tool
+async def get_file_churn(repo_name: str, top_n: int = 20, path_prefix: str = ""):
+    """
+    Useful to find hotspots: the files that change most often, from the whole commit history.
+    Much cheaper than reading diffs with get_recent_commits_with_diffs.
+
+    Args:
+        repo_name (str): name of the repo with organization, for example, organization_name/repo_name.
+        top_n (int, optional): Number of files to return. Defaults to 20.
+        path_prefix (str, optional): Only consider files under this path, for example, 'src/'. Defaults to all files.
+
+    Returns: Table of files with commit count, lines added/deleted, number of authors and last change date.
+    """
+
+    # utility function to check and update repo in ./tmp directory
+    await run_with_progress(check_if_repo_exists, repo_name)
+    index = await run_with_progress(update_history_index, repo_name)
+
+    files = [
+        (path, stats)
+        for path, stats in index["files"].items()
+        if path.startswith(path_prefix)
+    ]
+    files.sort(key=lambda item: (-item[1]["commits"], item[0]))
+
+    rows = [
+        (
+            path,
+            stats["commits"],
+            stats["additions"],
+            stats["deletions"],
+            len(stats["authors"]),
+            format_date(stats["last_commit_ts"]),
+        )
+        for path, stats in files[:top_n]
+    ]
+
+    return f"{index['commits']} commits indexed.\n" + format_table(
+        ["file", "commits", "added", "deleted", "authors", "last change"], rows
+    )
+
+
+@tool
+async def get_co_changed_files(repo_name: str, path: str = "", top_n: int = 20):
+    """
+    Useful to find files that are usually changed together (hidden coupling), from the whole commit history.
+
+    Args:
+        repo_name (str): name of the repo with organization, for example, organization_name/repo_name.
+        path (str, optional): Only return pairs involving this file. Defaults to all pairs.
+        top_n (int, optional): Number of pairs to return. Defaults to 20.
+
+    Returns: Table of file pairs with the number of commits changing both and their coupling ratio.
+    """
+
+    # utility function to check and update repo in ./tmp directory
+    await run_with_progress(check_if_repo_exists, repo_name)
+    index = await run_with_progress(update_history_index, repo_name)
+
+    pairs = []
+    for key, count in index["co_changes"].items():
+        path_a, path_b = key.split("\t")
+        if path and path not in (path_a, path_b):
+            continue
+        # share of the less frequently changed file's commits that also touched the other file
+        coupling = count / min(
+            index["files"][path_a]["commits"], index["files"][path_b]["commits"]
+        )
+        pairs.append((path_a, path_b, count, f"{coupling:.0%}"))
+    pairs.sort(key=lambda pair: (-pair[2], pair[0], pair[1]))
+
+    return format_table(["file", "file", "commits together", "coupling"], pairs[:top_n])
+
+
+@tool
+async def get_code_ownership(repo_name: str, path_prefix: str = "", top_n: int = 10):
+    """
+    Useful to find who owns a file or module: authors ranked by the commits touching it, from the whole commit history.
+
+    Args:
+        repo_name (str): name of the repo with organization, for example, organization_name/repo_name.
+        path_prefix (str, optional): File or directory to look at, for example, 'src/agent/'. Defaults to the whole repo.
+        top_n (int, optional): Number of authors to return. Defaults to 10.
+
+    Returns: Table of authors with commits, lines changed, share of commits and their last commit date.
+    """
+
+    # utility function to check and update repo in ./tmp directory
+    await run_with_progress(check_if_repo_exists, repo_name)
+    index = await run_with_progress(update_history_index, repo_name)
+
+    owners = {}
+    for path, stats in index["files"].items():
+        if not path.startswith(path_prefix):
+            continue
+        for author, (commits, lines_changed, last_commit_ts) in stats[
+            "authors"
+        ].items():
+            owner = owners.setdefault(author, [0, 0, 0])
+            owner[0] += commits
+            owner[1] += lines_changed
+            # last commit touching `path_prefix`, not anywhere in the repo
+            owner[2] = max(owner[2], last_commit_ts)
+
+    if not owners:
+        return f"No history found for '{path_prefix}' in '{repo_name}'."
+
+    total_commits = sum(commits for commits, _, _ in owners.values())
+    ranked = sorted(owners.items(), key=lambda item: (-item[1][0], item[0]))
+    rows = [
+        (
+            author,
+            commits,
+            lines_changed,
+            f"{commits / total_commits:.0%}",
+            format_date(last_commit_ts),
+        )
+        for author, (commits, lines_changed, last_commit_ts) in ranked[:top_n]
+    ]
+
+    return format_table(
+        ["author", "file commits", "lines changed", "share", "last active"], rows
+    )
+
+
+@tool
 def get_recent_issues_and_prs(owner: str, repo: str, num_items: int = 5):
     """
     Retrieves recent Issues and Pull Requests separately from a public GitHub repository using the REST API.
@@ -277,6 +1802,8 @@ def get_recent_issues_and_prs(owner: str, repo: str, num_items: int = 5):
 
     Returns (str): A formatted string containing both Issues and PRs, or None on failure.
     """
+    import requests
+
     try:
         details = []
 
@@ -357,9 +1884,18 @@ def get_recent_issues_and_prs(owner: str, repo: str, num_items: int = 5):
 
 
 if __name__ == "__main__":
+    # `python src/mcp_servers/git_mcp_server.py gc` collects the shared object pool and exits
+    if sys.argv[1:] == ["gc"]:
+        gc_object_pool()
+        sys.exit(0)
+
     # Transport methods: ['stdio', 'sse', 'streamable-http']
     transport = "stdio"
 
+    mcp = create_server()
+    if PREFORK_HEAVY_TOOL_WORKERS:
+        start_warm_standby()
+
     if transport == "stdio":
         logging.info("Running with stdio transport")
         mcp.run(transport="stdio")
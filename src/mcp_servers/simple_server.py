@@ -1,9 +1,12 @@
+import os
+import sys
+
 from mcp.server.fastmcp import FastMCP
 
 mcp = FastMCP(
     name="Calculator",
     host="0.0.0.0",
-    port=8050,
+    port=int(os.environ.get("SIMPLE_SERVER_PORT", 8050)),
 )
 
 
@@ -13,18 +16,31 @@ def add(a: int, b: int) -> int:
     return a + b
 
 
+@mcp.tool()
+def payload(size_bytes: int) -> str:
+    """Return a synthetic string of `size_bytes` bytes, to measure the cost of large responses."""
+    return "x" * size_bytes
+
+
+@mcp.tool()
+def echo(data: str) -> int:
+    """Return the length of `data`, to measure the cost of large requests."""
+    return len(data)
+
+
 if __name__ == "__main__":
     # Transport methods: ['stdio', 'sse', 'streamable-http']
-    transport = "stdio"
+    transport = sys.argv[1] if len(sys.argv) > 1 else "stdio"
 
+    # stdout carries the protocol messages of the stdio transport
     if transport == "stdio":
-        print("Running with stdio transport")
+        print("Running with stdio transport", file=sys.stderr)
         mcp.run(transport="stdio")
     elif transport == "sse":
-        print("Running with sse transport")
+        print("Running with sse transport", file=sys.stderr)
         mcp.run(transport="sse")
     elif transport == "streamable-http":
-        print("Running with streamable-http transport")
+        print("Running with streamable-http transport", file=sys.stderr)
         mcp.run(transport="streamable-http")
     else:
         raise ValueError(f"Invalid transport format: {transport}")
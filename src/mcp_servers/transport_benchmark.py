@@ -0,0 +1,315 @@
+"""
+Load test of the MCP transports against `simple_server.py`, measuring transport overhead apart from git work.
+
+N concurrent sessions call `add` and the synthetic `payload` (large responses) and `echo` (large
+requests) tools over stdio, SSE and streamable-HTTP. For every workload it reports calls/sec,
+p50/p95/p99 latency, the share of the latency spent on the per-call overhead measured by `add`
+(framing, JSON-RPC, session handling) and, for large payloads, the serialization cost per MB:
+the p50 latency above the `add` baseline divided by the payload size. Run from the repository root:
+
+    python -m src.mcp_servers.transport_benchmark --sessions 1 8 --payload-sizes 1024 1048576
+
+Every stdio session spawns its own server process, as the app does; the HTTP transports share
+one server process per transport.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.sse import sse_client
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+
+SERVER_PATH = Path(__file__).with_name("simple_server.py")
+TRANSPORTS = ["stdio", "sse", "streamable-http"]
+PAYLOAD_TOOLS = ["payload", "echo"]
+DEFAULT_PORT = 8050
+SERVER_START_TIMEOUT_S = 20
+# Calls per session before measuring, to leave connection setup and imports out of the numbers
+WARM_UP_CALLS = 3
+# Below this size the payload cost drowns in the noise of the per-call overhead, no ms/MB is reported
+MIN_COST_PAYLOAD_BYTES = 64 * 1024
+
+
+@dataclass
+class BenchmarkResult:
+    """Measurements of one workload: a tool and payload size called by N concurrent sessions."""
+
+    transport: str
+    sessions: int
+    tool: str
+    payload_bytes: int
+    calls: int
+    errors: int
+    duration_s: float
+    calls_per_s: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    # Share of the p50 latency spent on the per-call overhead measured by `add`
+    overhead_pct: Optional[float] = None
+    # p50 latency above the `add` baseline per MB of payload, None for small payloads
+    ms_per_mb: Optional[float] = None
+
+
+def percentile(samples: list[float], p: float) -> float:
+    samples = sorted(samples)
+    return samples[min(int(len(samples) * p / 100), len(samples) - 1)]
+
+
+def tool_arguments(tool: str, payload_bytes: int) -> dict:
+    if tool == "payload":
+        return {"size_bytes": payload_bytes}
+    if tool == "echo":
+        return {"data": "x" * payload_bytes}
+    return {"a": 2, "b": 3}
+
+
+def start_http_server(transport: str, port: int) -> subprocess.Popen:
+    """Start `simple_server.py` with an HTTP transport and wait until it accepts connections."""
+
+    process = subprocess.Popen(
+        [sys.executable, str(SERVER_PATH), transport],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env={**os.environ, "SIMPLE_SERVER_PORT": str(port)},
+    )
+
+    deadline = time.monotonic() + SERVER_START_TIMEOUT_S
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(
+                f"{transport} server exited with code {process.returncode}"
+            )
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return process
+        except OSError:
+            time.sleep(0.1)
+
+    process.kill()
+    raise TimeoutError(
+        f"{transport} server did not start within {SERVER_START_TIMEOUT_S}s"
+    )
+
+
+@asynccontextmanager
+async def open_session(transport: str, port: int):
+    """Open an initialized client session to the benchmark server over `transport`."""
+
+    async with AsyncExitStack() as stack:
+        if transport == "stdio":
+            server_params = StdioServerParameters(
+                command=sys.executable, args=[str(SERVER_PATH), "stdio"]
+            )
+            # the server logs every request, keep that out of the benchmark output
+            errlog = stack.enter_context(open(os.devnull, "w"))
+            read, write = await stack.enter_async_context(
+                stdio_client(server_params, errlog=errlog)
+            )
+        elif transport == "sse":
+            read, write = await stack.enter_async_context(
+                sse_client(f"http://127.0.0.1:{port}/sse")
+            )
+        elif transport == "streamable-http":
+            read, write, _ = await stack.enter_async_context(
+                streamablehttp_client(f"http://127.0.0.1:{port}/mcp")
+            )
+        else:
+            raise ValueError(f"Invalid transport format: {transport}")
+
+        session = await stack.enter_async_context(ClientSession(read, write))
+        await session.initialize()
+        yield session
+
+
+async def run_calls(
+    session: ClientSession, tool: str, arguments: dict, calls: int, latencies: list
+) -> int:
+    """Call `tool` `calls` times in a row, appending latencies in seconds.
+
+    Returns: Number of failed calls.
+    """
+
+    errors = 0
+    for _ in range(calls):
+        started = time.perf_counter()
+        try:
+            result = await session.call_tool(tool, arguments)
+            errors += result.isError
+        except Exception as e:
+            logging.debug(f"{tool} call failed: {e}")
+            errors += 1
+        latencies.append(time.perf_counter() - started)
+
+    return errors
+
+
+async def benchmark_transport(
+    transport: str,
+    sessions: int,
+    workloads: list[tuple[str, int]],
+    calls: int,
+    port: int,
+) -> list[BenchmarkResult]:
+    """Run every (tool, payload size) workload with `sessions` concurrent sessions over `transport`."""
+
+    results = []
+    async with AsyncExitStack() as stack:
+        clients = [
+            await stack.enter_async_context(open_session(transport, port))
+            for _ in range(sessions)
+        ]
+
+        for tool, payload_bytes in workloads:
+            arguments = tool_arguments(tool, payload_bytes)
+            await asyncio.gather(
+                *(
+                    run_calls(client, tool, arguments, WARM_UP_CALLS, [])
+                    for client in clients
+                )
+            )
+
+            latencies = []
+            started = time.perf_counter()
+            errors = await asyncio.gather(
+                *(
+                    run_calls(client, tool, arguments, calls, latencies)
+                    for client in clients
+                )
+            )
+            duration_s = time.perf_counter() - started
+
+            results.append(
+                BenchmarkResult(
+                    transport=transport,
+                    sessions=sessions,
+                    tool=tool,
+                    payload_bytes=payload_bytes,
+                    calls=len(latencies),
+                    errors=sum(errors),
+                    duration_s=duration_s,
+                    calls_per_s=len(latencies) / duration_s,
+                    p50_ms=percentile(latencies, 50) * 1000,
+                    p95_ms=percentile(latencies, 95) * 1000,
+                    p99_ms=percentile(latencies, 99) * 1000,
+                )
+            )
+            logging.info(
+                f"{transport} x{sessions} {tool}({payload_bytes:,}B): "
+                f"{results[-1].calls_per_s:.0f} calls/s, p50 {results[-1].p50_ms:.2f}ms"
+            )
+
+    baseline_ms = next(result.p50_ms for result in results if result.tool == "add")
+    for result in results:
+        result.overhead_pct = min(baseline_ms / result.p50_ms, 1) * 100
+        if result.tool != "add" and result.payload_bytes >= MIN_COST_PAYLOAD_BYTES:
+            result.ms_per_mb = (result.p50_ms - baseline_ms) / (
+                result.payload_bytes / 2**20
+            )
+
+    return results
+
+
+def format_results(results: list[BenchmarkResult]) -> str:
+    header = (
+        f"{'transport':<16}{'sessions':>9}{'tool':>9}{'payload':>12}{'calls/s':>10}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'overhead':>10}{'ms/MB':>10}{'errors':>8}"
+    )
+    lines = [header, "-" * len(header)]
+    for result in results:
+        ms_per_mb = "" if result.ms_per_mb is None else f"{result.ms_per_mb:.2f}"
+        lines.append(
+            f"{result.transport:<16}{result.sessions:>9}{result.tool:>9}{result.payload_bytes:>12,}"
+            f"{result.calls_per_s:>10.0f}{result.p50_ms:>10.2f}{result.p95_ms:>10.2f}"
+            f"{result.p99_ms:>10.2f}{result.overhead_pct:>9.0f}%{ms_per_mb:>10}{result.errors:>8}"
+        )
+    return "\n".join(lines)
+
+
+async def run_benchmark(args: argparse.Namespace) -> list[BenchmarkResult]:
+    workloads = [("add", 0)] + [
+        (tool, size) for tool in PAYLOAD_TOOLS for size in args.payload_sizes
+    ]
+
+    results = []
+    for transport in args.transports:
+        server = None
+        if transport != "stdio":
+            server = start_http_server(transport, args.port)
+        try:
+            for sessions in args.sessions:
+                results += await benchmark_transport(
+                    transport, sessions, workloads, args.calls, args.port
+                )
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=10)
+
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--transports", nargs="+", choices=TRANSPORTS, default=TRANSPORTS
+    )
+    parser.add_argument(
+        "--sessions",
+        nargs="+",
+        type=int,
+        default=[1, 8],
+        help="Numbers of concurrent sessions to run each workload with.",
+    )
+    parser.add_argument(
+        "--calls", type=int, default=100, help="Calls per session and workload."
+    )
+    parser.add_argument(
+        "--payload-sizes",
+        nargs="+",
+        type=int,
+        default=[1024, 64 * 1024, 1024 * 1024],
+        help="Payload sizes in bytes of the `payload` and `echo` workloads.",
+    )
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--output", type=Path, help="Also write the results to this JSON file."
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="[%(asctime)s] %(levelname)-8s %(message)s",
+        datefmt="%m/%d/%y %H:%M:%S",
+    )
+    # one log line per HTTP request and per session otherwise
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger("mcp").setLevel(logging.WARNING)
+
+    results = asyncio.run(run_benchmark(args))
+    print(format_results(results))
+
+    if args.output:
+        args.output.write_text(
+            json.dumps([asdict(result) for result in results], indent=2)
+        )
+
+    return 1 if any(result.errors for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+import hashlib
+import re
+from pathlib import Path
+from typing import Optional
+
+from langchain_core.tools import BaseTool, StructuredTool, tool
+
+from src.utilities.constants import (
+    ARTIFACT_DIR,
+    ARTIFACT_PREVIEW_CHARS,
+    ARTIFACT_SPILL_THRESHOLD_CHARS,
+)
+
+HANDLE_PATTERN = re.compile(r"^artifact:([0-9a-f]{16})$")
+
+
+def spill_large_output(content):
+    """
+    Keep tool outputs above the threshold out of the conversation state.
+
+    The full output is written to a content-addressed file under ARTIFACT_DIR and replaced by
+    a compact handle plus a preview; the model can fetch slices of it with `read_artifact`.
+
+    Args:
+        content: Content of a ToolMessage, only strings are spilled.
+
+    Returns: The content itself if small enough, else the handle and preview as a string.
+    """
+
+    if not isinstance(content, str) or len(content) <= ARTIFACT_SPILL_THRESHOLD_CHARS:
+        return content
+
+    data = content.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    path = Path(ARTIFACT_DIR) / f"{digest}.txt"
+    if not path.is_file():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+
+    return (
+        f"[Output of {len(content):,} characters ({content.count(chr(10)) + 1:,} lines, {len(data):,} bytes) "
+        f"stored as artifact:{digest}. Use the `read_artifact` tool with this handle and a line or byte "
+        f"range to read more of it.]\n"
+        f"Preview:\n{content[:ARTIFACT_PREVIEW_CHARS]}"
+    )
+
+
+def with_spilled_output(wrapped: BaseTool) -> BaseTool:
+    """Wrap a tool so its large outputs are spilled as soon as they are produced.
+
+    For agents whose tool loop is not ours, like `create_react_agent`, where outputs would
+    otherwise reach the model in full.
+    """
+
+    def call(**kwargs):
+        return spill_large_output(wrapped.invoke(kwargs))
+
+    async def acall(**kwargs):
+        return spill_large_output(await wrapped.ainvoke(kwargs))
+
+    return StructuredTool(
+        name=wrapped.name,
+        description=wrapped.description,
+        args_schema=wrapped.args_schema,
+        func=call,
+        coroutine=acall,
+        handle_tool_error=wrapped.handle_tool_error,
+    )
+
+
+@tool
+def read_artifact(
+    handle: str,
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None,
+    start_byte: Optional[int] = None,
+    end_byte: Optional[int] = None,
+) -> str:
+    """
+    Read a slice of a large tool output that was stored as an artifact.
+
+    Args:
+        handle (str): Artifact handle from a previous tool output, for example, artifact:0123456789abcdef.
+        start_line (int, optional): First line to return, 1-based and inclusive.
+        end_line (int, optional): Last line to return, inclusive.
+        start_byte (int, optional): First byte to return, used when no line range is given.
+        end_byte (int, optional): Byte offset to stop at, exclusive.
+
+    Returns: The requested slice of the artifact.
+    """
+
+    match = HANDLE_PATTERN.match(handle.strip())
+    if not match:
+        return f"Invalid artifact handle '{handle}', expected artifact:<16 hex characters>."
+
+    path = Path(ARTIFACT_DIR) / f"{match.group(1)}.txt"
+    if not path.is_file():
+        return f"Artifact '{handle}' not found."
+
+    data = path.read_bytes()
+    if start_line is not None or end_line is not None:
+        lines = data.decode("utf-8", errors="ignore").splitlines()
+        start = max((start_line or 1) - 1, 0)
+        content = "\n".join(lines[start : end_line or len(lines)])
+    else:
+        content = data[start_byte or 0 : end_byte].decode("utf-8", errors="ignore")
+
+    if len(content) > ARTIFACT_SPILL_THRESHOLD_CHARS:
+        # stays within the threshold with the note, a slice that is spilled again is never readable
+        note = f"\n[Truncated to {ARTIFACT_SPILL_THRESHOLD_CHARS:,} characters, request a smaller range.]"
+        return content[: ARTIFACT_SPILL_THRESHOLD_CHARS - len(note)] + note
+
+    return content
@@ -6,6 +6,104 @@ SIMPLE_ACTION_LLM = "gpt-4.1"
 SUMMARIZER_LLM = "gpt-4o"
 REPLANNER_LLM = "gpt-4.1"
 FINALIZER_LLM = "gpt-4.1"
+REACT_LLM = "gpt-4o"
+FALLBACK_LLM = "gpt-4o-mini"
+
+# Model policy per graph node, see `src.utilities.model_policy.ModelPolicy`.
+# The executor runs a whole tool-calling loop, so it is neither hedged nor retried with a fallback
+# model: either would repeat every tool call, and a fallback would double its worst-case latency.
+# A step that exceeds its deadline is reported to the replanner as unfinished instead.
+MODEL_POLICIES = {
+    "planner": {
+        "model": PLANNER_LLM,
+        "fallback_model": FALLBACK_LLM,
+        "timeout_s": 45,
+        "hedge": True,
+    },
+    "summarizer": {
+        "model": SUMMARIZER_LLM,
+        "fallback_model": FALLBACK_LLM,
+        "timeout_s": 30,
+        "hedge": True,
+    },
+    "executor": {
+        "model": SIMPLE_ACTION_LLM,
+        "fallback_model": None,
+        "timeout_s": 180,
+        "hedge": False,
+    },
+    "replanner": {
+        "model": REPLANNER_LLM,
+        "fallback_model": FALLBACK_LLM,
+        "timeout_s": 45,
+        "hedge": True,
+    },
+    "finalizer": {
+        "model": FINALIZER_LLM,
+        "fallback_model": FALLBACK_LLM,
+        "timeout_s": 60,
+        "hedge": True,
+    },
+    "react": {
+        "model": REACT_LLM,
+        "fallback_model": FALLBACK_LLM,
+        "timeout_s": 45,
+        "hedge": True,
+    },
+}
+# Hedged requests wait for this percentile of recent latencies, once enough samples are collected.
+HEDGE_MIN_SAMPLES = 20
+HEDGE_LATENCY_PERCENTILE = 0.95
+
+# Process-wide admission control of LLM requests, see `src.utilities.llm_scheduler.LLMScheduler`.
+LLM_REQUESTS_PER_MINUTE = 500
+LLM_TOKENS_PER_MINUTE = 200_000
+LLM_MAX_CONCURRENCY = 16
+LLM_DEFAULT_OUTPUT_TOKENS = 1000
+LLM_QUEUE_POLL_S = 1.0
+LLM_BACKPRESSURE_WARNING_S = 5.0
+# Retries go back through the scheduler instead of the OpenAI client's own retry loop, which
+# would hold the admission slot. A 429 pauses admissions for its Retry-After, or this default.
+LLM_MAX_RETRIES = 2
+LLM_RETRY_BACKOFF_S = 1.0
+LLM_RATE_LIMIT_PAUSE_S = 5.0
+# Lower value is served first: interactive answers before background summarization.
+LLM_PRIORITIES = {
+    "react": 0,
+    "finalizer": 0,
+    "planner": 1,
+    "executor": 1,
+    "replanner": 1,
+    "summarizer": 2,
+}
+
+# Tool outputs above the threshold are stored on disk and referenced by handle in messages.
+ARTIFACT_DIR = "./tmp/.artifacts/"
+ARTIFACT_SPILL_THRESHOLD_CHARS = 8000
+ARTIFACT_PREVIEW_CHARS = 1500
+
+# Auto mode: prompts scoring at least the threshold go to the planner, the rest to the ReAct agent,
+# which escalates to the planner once it has made REACT_ESCALATION_TOOL_CALLS tool calls without answering.
+ROUTER_PLANNER_SCORE_THRESHOLD = 2
+ROUTER_LONG_PROMPT_WORDS = 40
+ROUTER_PLANNER_KEYWORDS = (
+    "analy",
+    "compare",
+    "architecture",
+    "design",
+    "explain how",
+    "in detail",
+    "detailed",
+    "comprehensive",
+    "strategy",
+    "step by step",
+    "review",
+    "evaluate",
+    "trade-off",
+    "tradeoff",
+    "across",
+)
+REACT_ESCALATION_TOOL_CALLS = 6
 
 PLANNER_SYSTEM_PROMPT = dedent(
     """Planner Stage:
@@ -13,6 +111,7 @@ PLANNER_SYSTEM_PROMPT = dedent(
 - This plan should involve individual tasks, that if executed correctly will yield the correct answer. Do not add any superfluous steps.
 - Be very explicit and detailed with the steps of the plan. Add all the necessary information in the step.
 - The result of the final step should be the final answer. Make sure that each step has all the information needed - do not skip steps.
+- To learn what a repository is about (languages, dependencies, entry points, tests, README), use a single `get_repo_manifest` call instead of exploring the structure and files step by step.
 """
 )
 
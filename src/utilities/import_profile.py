@@ -0,0 +1,99 @@
+"""
+Import-time profile of the app and server modules, checked against a budget per module.
+
+Every module is imported in a fresh interpreter with `-X importtime`, so the numbers are cold
+start costs. The budgets are enforced by `tests/test_import_budget.py`; for a report of the
+slowest dependencies of every module, run from the repository root:
+
+    python -m src.utilities.import_profile
+"""
+
+import os
+import subprocess
+import sys
+
+# Cumulative import time budget per module, in milliseconds
+IMPORT_BUDGETS_MS = {
+    # imported by every heavy tool worker process, must not pull FastMCP, GitPython or requests
+    "src.mcp_servers.git_mcp_server": 150,
+    "src.utilities.constants": 30,
+    "src.utilities.llm_scheduler": 120,
+    "src.utilities.prefetch": 1200,
+    "src.agent.router": 1200,
+    "main": 2000,
+    "src.agent.react_agent": 3000,
+    "src.agent.planner_agent": 3000,
+}
+# Modules forbidden in the import closure of a module
+FORBIDDEN_IMPORTS = {
+    "src.mcp_servers.git_mcp_server": {"mcp", "git", "requests", "anyio"},
+    "main": {"PIL", "langgraph", "langchain_openai", "langchain_mcp_adapters"},
+}
+RUNS = 3
+TOP_N = 10
+
+
+def profile_import(module: str) -> dict[str, int]:
+    """Import `module` in a fresh interpreter and return the cumulative import time of every module, in microseconds."""
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.getcwd()},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        timings[name.strip()] = int(cumulative)
+
+    return timings
+
+
+def best_profile(module: str) -> dict[str, int]:
+    """Best of RUNS `profile_import` runs, to keep the noise of a busy machine out of the budget check."""
+    runs = [profile_import(module) for _ in range(RUNS)]
+    return min(runs, key=lambda run: run[module])
+
+
+def forbidden_imports(module: str, timings: dict[str, int]) -> set[str]:
+    """Modules of `timings` that FORBIDDEN_IMPORTS keeps out of the import closure of `module`."""
+    return {
+        name
+        for name in timings
+        if name.split(".")[0] in FORBIDDEN_IMPORTS.get(module, set())
+    }
+
+
+def main() -> int:
+    for module, budget_ms in IMPORT_BUDGETS_MS.items():
+        timings = best_profile(module)
+        total_ms = timings[module] / 1000
+
+        status = "OK  " if total_ms <= budget_ms else "SLOW"
+        print(f"{status} {module}: {total_ms:.0f}ms (budget {budget_ms}ms)")
+        forbidden = forbidden_imports(module, timings)
+        if forbidden:
+            print(f"       imports {sorted(forbidden)} eagerly")
+
+        top_level = sorted(
+            (
+                (name, us)
+                for name, us in timings.items()
+                if "." not in name and name != module
+            ),
+            key=lambda item: -item[1],
+        )
+        for name, us in top_level[:TOP_N]:
+            print(f"       {us / 1000:8.1f}ms  {name}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from src.utilities.constants import (
+    LLM_BACKPRESSURE_WARNING_S,
+    LLM_MAX_CONCURRENCY,
+    LLM_QUEUE_POLL_S,
+    LLM_REQUESTS_PER_MINUTE,
+    LLM_TOKENS_PER_MINUTE,
+)
+
+# Set per Streamlit session and per graph node, picked up by every LLM call made below them.
+current_session_id = contextvars.ContextVar("llm_session_id", default="default")
+current_priority = contextvars.ContextVar("llm_priority", default=1)
+
+
+class TokenBucket:
+    """Token bucket refilled continuously up to a per-minute capacity."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.available = per_minute
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.available = min(
+            self.capacity, self.available + (now - self.updated) * self.capacity / 60
+        )
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` is available, 0 if it already is."""
+        missing = min(amount, self.capacity) - self.available
+        return max(missing, 0) * 60 / self.capacity
+
+
+@dataclass
+class Ticket:
+    """A request waiting for, or holding, admission to the LLM API."""
+
+    priority: int
+    session_id: str
+    tokens: int
+    notify: Callable[[], None]
+    enqueued_at: float = field(default_factory=time.monotonic)
+    granted: bool = False
+
+
+class LLMScheduler:
+    """
+    Process-wide admission control in front of every LLM request.
+
+    Requests are admitted while the requests-per-minute and tokens-per-minute buckets and the
+    concurrency limit allow it. Waiting requests are served by priority (lower value first) and,
+    within a priority, round-robin across sessions, so one busy session cannot starve the others.
+    Under load callers queue up here instead of piling 429 retries onto the API.
+
+    Works across the event loops of concurrent Streamlit sessions, all state is guarded by a thread lock.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = LLM_TOKENS_PER_MINUTE,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+    ):
+        self.max_concurrency = max_concurrency
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._lock = threading.Lock()
+        # priority -> session id -> waiting tickets
+        self._queues = {}
+        self._in_flight = 0
+        self._granted = 0
+        self._total_wait_s = 0.0
+        self._max_wait_s = 0.0
+        self._paused_until = 0.0
+        self._rate_limited = 0
+
+    async def acquire(self, tokens: int) -> Ticket:
+        """Wait for admission of a request estimated at `tokens` tokens, from an event loop."""
+
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        ticket = self._enqueue(tokens, lambda: loop.call_soon_threadsafe(event.set))
+
+        try:
+            retry_after = self._dispatch()
+            while not ticket.granted:
+                try:
+                    await asyncio.wait_for(
+                        event.wait(),
+                        timeout=min(retry_after or LLM_QUEUE_POLL_S, LLM_QUEUE_POLL_S),
+                    )
+                except TimeoutError:
+                    pass
+                event.clear()
+                retry_after = self._dispatch()
+        except BaseException:
+            self._abandon(ticket)
+            raise
+
+        self._record_wait(ticket)
+        return ticket
+
+    def acquire_sync(self, tokens: int) -> Ticket:
+        """Blocking variant of `acquire`, for synchronous LLM calls."""
+
+        event = threading.Event()
+        ticket = self._enqueue(tokens, event.set)
+
+        try:
+            retry_after = self._dispatch()
+            while not ticket.granted:
+                event.wait(
+                    timeout=min(retry_after or LLM_QUEUE_POLL_S, LLM_QUEUE_POLL_S)
+                )
+                event.clear()
+                retry_after = self._dispatch()
+        except BaseException:
+            self._abandon(ticket)
+            raise
+
+        self._record_wait(ticket)
+        return ticket
+
+    def release(self, ticket: Ticket, used_tokens: Optional[int] = None):
+        """Release the concurrency slot of `ticket` and settle the difference to its actual usage."""
+
+        with self._lock:
+            self._in_flight -= 1
+            if used_tokens is not None:
+                # may go negative: an underestimate is paid back before the next admissions
+                self._tokens.available -= used_tokens - ticket.tokens
+        self._dispatch()
+
+    def pause(self, seconds: float):
+        """Stop admissions for `seconds` and drain the buckets, after the API answered with a 429."""
+
+        with self._lock:
+            self._rate_limited += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            # the API's view of our usage wins over the buckets' estimate
+            self._requests.available = min(self._requests.available, 0)
+            self._tokens.available = min(self._tokens.available, 0)
+        logging.warning(
+            f"LLM API rate limit hit, pausing admissions for {seconds:.1f}s."
+        )
+
+    def queue_depth(self) -> int:
+        """Number of requests waiting for admission."""
+        with self._lock:
+            return sum(
+                len(tickets)
+                for sessions in self._queues.values()
+                for tickets in sessions.values()
+            )
+
+    def metrics(self) -> dict:
+        """Backpressure metrics: queue depth per priority, in-flight requests and wait times."""
+
+        with self._lock:
+            now = time.monotonic()
+            self._requests.refill(now)
+            self._tokens.refill(now)
+            return {
+                "queued": {
+                    priority: sum(len(tickets) for tickets in sessions.values())
+                    for priority, sessions in sorted(self._queues.items())
+                },
+                "in_flight": self._in_flight,
+                "granted": self._granted,
+                "avg_wait_s": (
+                    self._total_wait_s / self._granted if self._granted else 0
+                ),
+                "max_wait_s": self._max_wait_s,
+                "rate_limited": self._rate_limited,
+                "paused_s": max(self._paused_until - now, 0),
+                "requests_available": int(self._requests.available),
+                "tokens_available": int(self._tokens.available),
+            }
+
+    def _enqueue(self, tokens: int, notify: Callable[[], None]) -> Ticket:
+        ticket = Ticket(
+            priority=current_priority.get(),
+            session_id=current_session_id.get(),
+            tokens=tokens,
+            notify=notify,
+        )
+        with self._lock:
+            sessions = self._queues.setdefault(ticket.priority, OrderedDict())
+            sessions.setdefault(ticket.session_id, deque()).append(ticket)
+        return ticket
+
+    def _dispatch(self) -> Optional[float]:
+        """Admit waiting tickets while the limits allow it.
+
+        Returns: Seconds until the pause or the bucket blocking the next ticket ends, None if nothing waits on either.
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            self._requests.refill(now)
+            self._tokens.refill(now)
+            if now < self._paused_until:
+                return self._paused_until - now
+
+            while self._in_flight < self.max_concurrency:
+                ticket = self._next_ticket()
+                if ticket is None:
+                    return None
+
+                retry_after = max(
+                    self._requests.wait_time(1), self._tokens.wait_time(ticket.tokens)
+                )
+                if retry_after > 0:
+                    return retry_after
+
+                self._pop_ticket(ticket)
+                self._requests.available -= 1
+                self._tokens.available -= ticket.tokens
+                self._in_flight += 1
+                self._granted += 1
+                ticket.granted = True
+                try:
+                    ticket.notify()
+                except RuntimeError:
+                    # the event loop of the waiting session is already closed
+                    pass
+
+        return None
+
+    def _next_ticket(self) -> Optional[Ticket]:
+        for priority in sorted(self._queues):
+            sessions = self._queues[priority]
+            if sessions:
+                return next(iter(sessions.values()))[0]
+        return None
+
+    def _pop_ticket(self, ticket: Ticket):
+        sessions = self._queues[ticket.priority]
+        tickets = sessions[ticket.session_id]
+        tickets.remove(ticket)
+        if tickets:
+            # round-robin: the session goes to the back of its priority's queue
+            sessions.move_to_end(ticket.session_id)
+        else:
+            del sessions[ticket.session_id]
+
+    def _abandon(self, ticket: Ticket):
+        with self._lock:
+            granted = ticket.granted
+            if not granted:
+                self._pop_ticket(ticket)
+        if granted:
+            self.release(ticket)
+        else:
+            self._dispatch()
+
+    def _record_wait(self, ticket: Ticket):
+        wait_s = time.monotonic() - ticket.enqueued_at
+        with self._lock:
+            self._total_wait_s += wait_s
+            self._max_wait_s = max(self._max_wait_s, wait_s)
+        if wait_s > LLM_BACKPRESSURE_WARNING_S:
+            logging.warning(
+                f"LLM request of session {ticket.session_id} (priority {ticket.priority}) "
+                f"waited {wait_s:.1f}s for admission: {self.metrics()}"
+            )
+
+
+llm_scheduler = LLMScheduler()
@@ -0,0 +1,363 @@
+import asyncio
+import contextvars
+import itertools
+import logging
+import re
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+import openai
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
+from langchain_core.runnables import Runnable
+from langchain_openai import ChatOpenAI
+
+from src.utilities.constants import (
+    HEDGE_LATENCY_PERCENTILE,
+    HEDGE_MIN_SAMPLES,
+    LLM_DEFAULT_OUTPUT_TOKENS,
+    LLM_MAX_RETRIES,
+    LLM_PRIORITIES,
+    LLM_RATE_LIMIT_PAUSE_S,
+    LLM_RETRY_BACKOFF_S,
+    MODEL_POLICIES,
+)
+from src.utilities.llm_scheduler import current_priority, llm_scheduler
+
+
+@dataclass
+class ModelPolicy:
+    """How a graph node calls its model: which one, how long to wait and what to do when it is slow."""
+
+    model: str
+    # Faster model used when the primary one times out or errors
+    fallback_model: Optional[str] = None
+    # Deadline of a single request, None to wait forever
+    timeout_s: Optional[float] = None
+    # Send a second identical request when the first one is slower than the observed p95
+    hedge: bool = False
+    # Hedge delay used until enough latencies are observed, None to not hedge until then
+    hedge_after_s: Optional[float] = None
+
+
+def estimate_tokens(messages: list[BaseMessage], max_tokens: Optional[int]) -> int:
+    """Rough token estimate of a request, about 4 characters per token plus the expected output."""
+    prompt_chars = sum(len(str(message.content)) for message in messages)
+    return prompt_chars // 4 + (max_tokens or LLM_DEFAULT_OUTPUT_TOKENS)
+
+
+def used_tokens(result: ChatResult) -> Optional[int]:
+    return ((result.llm_output or {}).get("token_usage") or {}).get("total_tokens")
+
+
+# Called once a request enters the scheduler's queue and once it is admitted, so latencies
+# exclude the time spent queued
+on_queued = contextvars.ContextVar("llm_on_queued", default=None)
+on_admission = contextvars.ContextVar("llm_on_admission", default=None)
+
+
+def notify_queued():
+    callback = on_queued.get()
+    if callback is not None:
+        callback()
+
+
+def notify_admission():
+    callback = on_admission.get()
+    if callback is not None:
+        callback()
+
+
+# Units of the x-ratelimit-reset-* durations
+DURATION_UNITS_S = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+# Transient errors retried after a backoff, outside of the admission slot
+RETRYABLE_ERRORS = (openai.APIConnectionError, openai.InternalServerError)
+
+
+def retry_after(error: openai.APIStatusError) -> float:
+    """Seconds the API asks us to wait after a 429, from its Retry-After or x-ratelimit-reset-* headers."""
+
+    headers = error.response.headers
+    if headers.get("retry-after-ms"):
+        return float(headers["retry-after-ms"]) / 1000
+    if (headers.get("retry-after") or "").replace(".", "", 1).isdigit():
+        return float(headers["retry-after"])
+
+    # reset durations look like "20ms", "1s" or "6m0s"
+    resets = []
+    for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens"):
+        parts = re.findall(r"([\d.]+)(ms|s|m|h)", headers.get(name) or "")
+        if parts:
+            resets.append(
+                sum(float(value) * DURATION_UNITS_S[unit] for value, unit in parts)
+            )
+    return max(resets, default=LLM_RATE_LIMIT_PAUSE_S)
+
+
+def retry_delay(error: Exception, attempt: int) -> Optional[float]:
+    """Seconds to wait before retrying after `error`, None if the request should not be retried."""
+
+    if isinstance(error, openai.RateLimitError):
+        # the scheduler holds back every request, this one included, until the limit resets;
+        # also after the last attempt, the other sessions would run into the same limit
+        llm_scheduler.pause(retry_after(error))
+        return 0 if attempt < LLM_MAX_RETRIES else None
+    if attempt >= LLM_MAX_RETRIES:
+        return None
+    if isinstance(error, RETRYABLE_ERRORS):
+        return LLM_RETRY_BACKOFF_S * 2**attempt
+    return None
+
+
+class ScheduledChatOpenAI(ChatOpenAI):
+    """
+    ChatOpenAI whose every request first goes through the process-wide `llm_scheduler`.
+
+    The client's own retries are disabled, see `chat_model`: a retry releases its admission slot
+    and queues again, and a 429 pauses the scheduler for every caller instead of one.
+    """
+
+    def _generate(
+        self, messages: list[BaseMessage], *args: Any, **kwargs: Any
+    ) -> ChatResult:
+        for attempt in itertools.count():
+            notify_queued()
+            ticket = llm_scheduler.acquire_sync(
+                estimate_tokens(messages, self.max_tokens)
+            )
+            notify_admission()
+            result = None
+            try:
+                result = super()._generate(messages, *args, **kwargs)
+                return result
+            except Exception as e:
+                delay = retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            finally:
+                llm_scheduler.release(ticket, result and used_tokens(result))
+            time.sleep(delay)
+
+    async def _agenerate(
+        self, messages: list[BaseMessage], *args: Any, **kwargs: Any
+    ) -> ChatResult:
+        for attempt in itertools.count():
+            notify_queued()
+            ticket = await llm_scheduler.acquire(
+                estimate_tokens(messages, self.max_tokens)
+            )
+            notify_admission()
+            result = None
+            try:
+                result = await super()._agenerate(messages, *args, **kwargs)
+                return result
+            except Exception as e:
+                delay = retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            finally:
+                llm_scheduler.release(ticket, result and used_tokens(result))
+            await asyncio.sleep(delay)
+
+    async def _astream(self, messages: list[BaseMessage], *args: Any, **kwargs: Any):
+        for attempt in itertools.count():
+            notify_queued()
+            ticket = await llm_scheduler.acquire(
+                estimate_tokens(messages, self.max_tokens)
+            )
+            notify_admission()
+            streamed = False
+            try:
+                async for chunk in super()._astream(messages, *args, **kwargs):
+                    streamed = True
+                    yield chunk
+                return
+            except Exception as e:
+                # a partially streamed answer cannot be retried
+                delay = None if streamed else retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            finally:
+                llm_scheduler.release(ticket)
+            await asyncio.sleep(delay)
+
+
+# Recent successful latencies per node, used to derive the hedge delay
+_latencies = defaultdict(lambda: deque(maxlen=200))
+
+
+def get_model_policy(node: str) -> ModelPolicy:
+    return ModelPolicy(**MODEL_POLICIES[node])
+
+
+def chat_model(model: str, **kwargs) -> ScheduledChatOpenAI:
+    """Chat model used by every node, so the client configuration lives in one place."""
+    # retries are made by ScheduledChatOpenAI, through the scheduler
+    return ScheduledChatOpenAI(model=model, temperature=0, max_retries=0, **kwargs)
+
+
+def record_latency(node: str, latency_s: float):
+    _latencies[node].append(latency_s)
+
+
+def hedge_delay(node: str, policy: ModelPolicy) -> Optional[float]:
+    """Delay after which a hedged request is sent, None when the node should not hedge."""
+
+    if not policy.hedge:
+        return None
+
+    samples = sorted(_latencies[node])
+    if len(samples) < HEDGE_MIN_SAMPLES:
+        return policy.hedge_after_s
+
+    return samples[min(int(len(samples) * HEDGE_LATENCY_PERCENTILE), len(samples) - 1)]
+
+
+async def ainvoke_with_policy(
+    node: str,
+    build_runnable: Callable[[str], Runnable],
+    input: Any,
+    policy: Optional[ModelPolicy] = None,
+):
+    """
+    Invoke the runnable of a graph node following its model policy.
+
+    The primary model gets `policy.timeout_s` to answer; if hedging is enabled a second identical
+    request is sent once the first is slower than the node's p95 latency and the first answer wins.
+    Latencies and the hedge delay count from admission by the scheduler, and no hedged request is
+    sent while other requests are queued in it; runnables bypassing the scheduler, like fake chat
+    models in tests, are measured from the start of their request.
+    On timeout or error the request is retried once with `policy.fallback_model`.
+
+    Args:
+        node (str): Name of the node, key of MODEL_POLICIES.
+        build_runnable (Callable[[str], Runnable]): Builds the runnable for a model name, for example,
+            `lambda model: chat_model(model).with_structured_output(Plan)`. Tests can return fake chat models here.
+        input: Input of the runnable.
+        policy (ModelPolicy, optional): Overrides the configured policy of the node.
+
+    Returns: Output of the runnable.
+    """
+
+    policy = policy or get_model_policy(node)
+    # LLM calls made below this point, including hedged and fallback ones, queue with the node's priority
+    priority_token = current_priority.set(LLM_PRIORITIES.get(node, 1))
+
+    try:
+        try:
+            return await _ainvoke_hedged(node, build_runnable, input, policy)
+        except Exception as e:
+            if not policy.fallback_model:
+                raise
+            logging.warning(
+                f"{node}: {policy.model} failed ({e!r}), falling back to {policy.fallback_model}."
+            )
+
+        return await asyncio.wait_for(
+            build_runnable(policy.fallback_model).ainvoke(input), policy.timeout_s
+        )
+    finally:
+        current_priority.reset(priority_token)
+
+
+async def _ainvoke_hedged(
+    node: str,
+    build_runnable: Callable[[str], Runnable],
+    input: Any,
+    policy: ModelPolicy,
+):
+    started = time.perf_counter()
+    deadline = None if policy.timeout_s is None else started + policy.timeout_s
+    # start and admission time per attempt, latencies and the hedge delay are measured from
+    # admission by the scheduler, or from the start for attempts that never queued in it
+    started_at = {}
+    queued = set()
+    admitted_at = {}
+    first_admission = asyncio.Event()
+
+    def start_attempt():
+        attempt = len(attempts)
+
+        def admitted():
+            if attempt not in admitted_at:
+                admitted_at[attempt] = time.perf_counter()
+                first_admission.set()
+
+        context = contextvars.copy_context()
+        context.run(on_queued.set, lambda: queued.add(attempt))
+        context.run(on_admission.set, admitted)
+        started_at[attempt] = time.perf_counter()
+        attempts.append(
+            asyncio.create_task(
+                build_runnable(policy.model).ainvoke(input), context=context
+            )
+        )
+
+    def remaining():
+        return None if deadline is None else deadline - time.perf_counter()
+
+    def capped(timeout_s):
+        return max(timeout_s if deadline is None else min(timeout_s, remaining()), 0)
+
+    def measured_from(attempt):
+        return admitted_at.get(attempt, started_at[attempt])
+
+    attempts = []
+    start_attempt()
+    pending = list(attempts)
+
+    try:
+        delay = hedge_delay(node, policy)
+        if delay is not None and (policy.timeout_s is None or delay < policy.timeout_s):
+            admission = asyncio.create_task(first_admission.wait())
+            try:
+                await asyncio.wait(
+                    [admission, attempts[0]],
+                    timeout=capped(delay),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                # time spent queued in the scheduler does not count towards the hedge delay
+                if 0 in queued and not first_admission.is_set():
+                    await asyncio.wait(
+                        [admission, attempts[0]],
+                        timeout=remaining(),
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+            finally:
+                admission.cancel()
+
+            if not attempts[0].done() and (first_admission.is_set() or 0 not in queued):
+                delay_left = delay - (time.perf_counter() - measured_from(0))
+                done, _ = await asyncio.wait(attempts, timeout=capped(delay_left))
+                # a saturated scheduler is the worst moment to double the demand
+                if not done and llm_scheduler.queue_depth() == 0:
+                    logging.info(
+                        f"{node}: no answer within {delay:.2f}s, sending hedged request."
+                    )
+                    start_attempt()
+                    pending = list(attempts)
+
+        while pending:
+            if remaining() is not None and remaining() <= 0:
+                break
+            done, pending_set = await asyncio.wait(
+                pending, timeout=remaining(), return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                break
+
+            for task in done:
+                if task.exception() is None:
+                    attempt = attempts.index(task)
+                    record_latency(node, time.perf_counter() - measured_from(attempt))
+                    return task.result()
+            pending = list(pending_set)
+            if not pending:
+                raise done.pop().exception()
+
+        raise TimeoutError(f"{policy.model} did not answer within {policy.timeout_s}s")
+    finally:
+        for task in attempts:
+            task.cancel()
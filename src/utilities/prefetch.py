@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import re
+from pathlib import Path
+
+from mcp import ClientSession
+
+# Name of the internal MCP tool that clones a repo and builds its manifest ahead of time.
+WARM_UP_TOOL = "warm_up_repo"
+
+# Local clones of the git MCP server, started from the same working directory as the app.
+CLONE_DIR = "./tmp/"
+
+# Matches `github.com/owner/repo` URLs, which may go on with a path (`/tree/main/src`), as well as
+# bare `owner/repo` mentions. The repo name is matched greedily, dots included (`vercel/next.js`),
+# and a bare mention must end the token: whitespace, end of text or closing punctuation follow it,
+# so `src/utils/main` is not a reference. Groups 1-2 are set for URLs, groups 3-4 for bare mentions.
+REPO_REFERENCE_PATTERN = re.compile(
+    r"(?<![\w./-])(?:"
+    r"(?:https?://)?(?:www\.)?github\.com/"
+    r"([A-Za-z0-9](?:[A-Za-z0-9-]{0,38}))/([A-Za-z0-9_.-]+)(?=[/#?\s)\]}>,;:!\"'`]|$)"
+    r"|([A-Za-z0-9](?:[A-Za-z0-9-]{0,38}))/([A-Za-z0-9_.-]+)(?=[\s)\]}>,;:!?\"'`]|$)"
+    r")"
+)
+
+# Extensions of file paths like `src/main.py`, which look like `owner/repo` mentions. Extensions
+# that are also common repo name suffixes, like `.js` (`vercel/next.js`) or `.io`, are left out.
+FILE_EXTENSIONS = {
+    ".c",
+    ".cfg",
+    ".cpp",
+    ".css",
+    ".csv",
+    ".go",
+    ".h",
+    ".html",
+    ".ini",
+    ".ipynb",
+    ".java",
+    ".json",
+    ".jsx",
+    ".lock",
+    ".md",
+    ".py",
+    ".rb",
+    ".rs",
+    ".rst",
+    ".sh",
+    ".toml",
+    ".ts",
+    ".tsx",
+    ".txt",
+    ".yaml",
+    ".yml",
+}
+
+# Bare mentions are only taken as repo references when there is no more likely reading: common
+# `word/word` phrases and paths starting with a usual directory name are skipped, unless the repo
+# is already cloned. URLs are always repo references.
+NON_REPO_REFERENCES = {
+    "and/or",
+    "async/await",
+    "back-end/front-end",
+    "backend/frontend",
+    "client/server",
+    "front-end/back-end",
+    "frontend/backend",
+    "get/set",
+    "i/o",
+    "input/output",
+    "n/a",
+    "react/angular",
+    "react/vue",
+    "read/write",
+    "request/response",
+    "server/client",
+    "tcp/ip",
+    "true/false",
+    "vue/react",
+    "yes/no",
+}
+PATH_DIRECTORIES = {
+    "app",
+    "apps",
+    "assets",
+    "bin",
+    "build",
+    "cmd",
+    "config",
+    "dist",
+    "docs",
+    "etc",
+    "examples",
+    "home",
+    "include",
+    "internal",
+    "lib",
+    "packages",
+    "pkg",
+    "public",
+    "scripts",
+    "src",
+    "static",
+    "test",
+    "tests",
+    "tmp",
+    "usr",
+    "utils",
+    "var",
+}
+
+
+def extract_repo_references(prompt: str) -> list[str]:
+    """Cheaply extract `owner/repo` references from the user prompt, without any LLM call.
+
+    Args:
+        prompt (str): The user prompt.
+
+    Returns: Unique repo names in order of appearance, for example, ['psf/requests'].
+    """
+
+    repo_names = []
+    for url_owner, url_repo, owner, repo in REPO_REFERENCE_PATTERN.findall(prompt):
+        is_url = bool(url_owner)
+        owner, repo = (url_owner, url_repo) if is_url else (owner, repo)
+        # a sentence may end right after the reference
+        repo = repo.rstrip(".").removesuffix(".git")
+        repo_name = f"{owner}/{repo}"
+        if not repo or repo_name in repo_names:
+            continue
+        if not is_url and not Path(CLONE_DIR + repo_name).is_dir():
+            if (
+                # fractions and dates, like 1/2 or 2024/10
+                owner.isdigit()
+                or repo.isdigit()
+                or Path(repo).suffix.lower() in FILE_EXTENSIONS
+                or repo_name.lower() in NON_REPO_REFERENCES
+                or owner.lower() in PATH_DIRECTORIES
+            ):
+                continue
+        repo_names.append(repo_name)
+
+    return repo_names
+
+
+def start_repo_warm_up(session: ClientSession, prompt: str) -> list[asyncio.Task]:
+    """Fire non-blocking warm-up requests for every repo referenced in the prompt.
+
+    The warm-ups run on the MCP server while the planner LLM is busy, and tool calls for the
+    same repo wait for the in-flight warm-up instead of cloning again.
+
+    Args:
+        session (ClientSession): Initialized session with the git MCP server.
+        prompt (str): The user prompt.
+
+    Returns: The in-flight warm-up tasks, to be passed to `finish_repo_warm_up`.
+    """
+
+    tasks = []
+    for repo_name in extract_repo_references(prompt):
+        logging.info(f"Warming up repo '{repo_name}' in the background...")
+        tasks.append(
+            asyncio.create_task(
+                session.call_tool(WARM_UP_TOOL, arguments={"repo_name": repo_name}),
+                name=f"warm_up:{repo_name}",
+            )
+        )
+
+    return tasks
+
+
+async def finish_repo_warm_up(tasks: list[asyncio.Task]):
+    """Cancel warm-ups the agent did not need to wait for and log the outcome of the others."""
+
+    for task in tasks:
+        if not task.done():
+            task.cancel()
+
+    for task, result in zip(
+        tasks, await asyncio.gather(*tasks, return_exceptions=True)
+    ):
+        if isinstance(result, asyncio.CancelledError):
+            logging.info(f"{task.get_name()} cancelled, not needed by the agent.")
+        elif isinstance(result, BaseException):
+            logging.error(f"{task.get_name()} failed: {result}")
+        else:
+            logging.info(f"{task.get_name()} done: {result.content[0].text}")
@@ -0,0 +1,44 @@
+import asyncio
+
+from langchain_core.messages import AIMessage
+
+from src.agent.react_agent import custom_tool_node
+from src.utilities import artifact_store
+from src.utilities.artifact_store import read_artifact, spill_large_output
+from src.utilities.constants import ARTIFACT_SPILL_THRESHOLD_CHARS
+
+
+def call_read_artifact(**args):
+    state = {
+        "messages": [
+            AIMessage(
+                content="",
+                tool_calls=[{"name": "read_artifact", "args": args, "id": "call_1"}],
+            )
+        ],
+        "tools": {"read_artifact": read_artifact},
+    }
+    return asyncio.run(custom_tool_node(state))["messages"][0].content
+
+
+def test_large_read_is_truncated_not_spilled_again(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifact_store, "ARTIFACT_DIR", str(tmp_path))
+    content = "\n".join(f"line {i}" for i in range(1, 20001))
+    preview = spill_large_output(content)
+    handle = preview.split("stored as ")[1].split(".")[0]
+
+    result = call_read_artifact(handle=handle, start_line=1, end_line=20000)
+
+    assert len(result) <= ARTIFACT_SPILL_THRESHOLD_CHARS
+    assert result.startswith("line 1\nline 2\n")
+    assert result.endswith("request a smaller range.]")
+
+
+def test_small_read_returns_the_slice(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifact_store, "ARTIFACT_DIR", str(tmp_path))
+    content = "\n".join(f"line {i}" for i in range(1, 20001))
+    handle = spill_large_output(content).split("stored as ")[1].split(".")[0]
+
+    assert call_read_artifact(handle=handle, start_line=10, end_line=12) == (
+        "line 10\nline 11\nline 12"
+    )
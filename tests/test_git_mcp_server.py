@@ -0,0 +1,147 @@
+import pytest
+
+from src.mcp_servers.git_mcp_server import (
+    build_repo_manifest,
+    check_regex_complexity,
+    parse_manifest_dependencies,
+)
+
+
+@pytest.mark.parametrize(
+    "search_pattern, rejected",
+    [
+        (r"def \w+\(", False),
+        ("foo|bar", False),
+        ("(foo|bar)", False),
+        ("(a+)+", True),
+        (r"(\w*\s?)*", True),
+        ("(a|aa)+c", True),
+        ("(x|y){2,}", True),
+        ("(unclosed", True),
+    ],
+)
+def test_check_regex_complexity(search_pattern, rejected):
+    assert (check_regex_complexity(search_pattern) is not None) == rejected
+
+
+SETUP_PY = """
+from setuptools import setup
+
+setup(
+    name="demo",
+    install_requires=["requests>=2", "click"],
+    extras_require={"dev": ["pytest"]},
+    entry_points={"console_scripts": ["demo = demo.cli:main"]},
+)
+"""
+
+SETUP_CFG = """
+[options]
+install_requires =
+    requests>=2
+    click  # cli
+
+[options.extras_require]
+dev = pytest
+
+[options.entry_points]
+console_scripts =
+    demo = demo.cli:main
+"""
+
+PIPFILE = """
+[packages]
+requests = "*"
+
+[dev-packages]
+pytest = "*"
+"""
+
+POM_XML = """<project xmlns="http://maven.apache.org/POM/4.0.0">
+  <dependencies>
+    <dependency>
+      <groupId>com.google.guava</groupId>
+      <artifactId>guava</artifactId>
+      <version>33.0.0-jre</version>
+    </dependency>
+    <dependency>
+      <groupId>junit</groupId>
+      <artifactId>junit</artifactId>
+      <scope>test</scope>
+    </dependency>
+  </dependencies>
+</project>
+"""
+
+BUILD_GRADLE = """
+dependencies {
+    implementation 'com.google.guava:guava:33.0.0-jre'
+    api("org.slf4j:slf4j-api:2.0.9")
+    testImplementation "junit:junit:4.13.2"
+}
+"""
+
+
+@pytest.mark.parametrize(
+    "file, content, expected",
+    [
+        (
+            "setup.py",
+            SETUP_PY,
+            {
+                "dependencies": ["requests>=2", "click"],
+                "optional_dependencies": {"dev": ["pytest"]},
+                "entry_points": ["demo = demo.cli:main"],
+            },
+        ),
+        (
+            "setup.cfg",
+            SETUP_CFG,
+            {
+                "dependencies": ["requests>=2", "click"],
+                "optional_dependencies": {"dev": ["pytest"]},
+                "entry_points": ["demo = demo.cli:main"],
+            },
+        ),
+        (
+            "Pipfile",
+            PIPFILE,
+            {"dependencies": ["requests"], "dev_dependencies": ["pytest"]},
+        ),
+        (
+            "pom.xml",
+            POM_XML,
+            {
+                "dependencies": ["com.google.guava:guava"],
+                "dev_dependencies": ["junit:junit"],
+            },
+        ),
+        (
+            "build.gradle",
+            BUILD_GRADLE,
+            {
+                "dependencies": ["com.google.guava:guava", "org.slf4j:slf4j-api"],
+                "dev_dependencies": ["junit:junit"],
+            },
+        ),
+    ],
+)
+def test_parse_manifest_dependencies(tmp_path, file, content, expected):
+    (tmp_path / file).write_text(content)
+
+    assert parse_manifest_dependencies(str(tmp_path / file)) == expected
+
+
+def test_lines_of_code_count_only_programming_languages(tmp_path):
+    (tmp_path / "main.py").write_text("import os\nprint(os.name)\n")
+    (tmp_path / "README.md").write_text("# Demo\n\nDocs.\n")
+    (tmp_path / "config.yaml").write_text("a: 1\nb: 2\n")
+
+    manifest = build_repo_manifest(str(tmp_path))
+
+    assert manifest["size"]["lines_of_code"] == 2
+    assert {entry["language"] for entry in manifest["languages"]} == {
+        "Python",
+        "Markdown",
+        "YAML",
+    }
@@ -0,0 +1,21 @@
+import pytest
+
+from src.utilities.import_profile import (
+    FORBIDDEN_IMPORTS,
+    IMPORT_BUDGETS_MS,
+    best_profile,
+    forbidden_imports,
+    profile_import,
+)
+
+
+@pytest.mark.parametrize("module, budget_ms", IMPORT_BUDGETS_MS.items())
+def test_import_time_within_budget(module, budget_ms):
+    total_ms = best_profile(module)[module] / 1000
+
+    assert total_ms <= budget_ms, f"{module} took {total_ms:.0f}ms"
+
+
+@pytest.mark.parametrize("module", FORBIDDEN_IMPORTS)
+def test_no_forbidden_imports(module):
+    assert not forbidden_imports(module, profile_import(module))
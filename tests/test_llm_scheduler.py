@@ -0,0 +1,112 @@
+import asyncio
+import time
+
+import httpx
+import openai
+
+from src.utilities import model_policy
+from src.utilities.constants import LLM_MAX_RETRIES
+from src.utilities.llm_scheduler import (
+    LLMScheduler,
+    current_priority,
+    current_session_id,
+)
+from src.utilities.model_policy import retry_after, retry_delay
+
+
+def admission_order(scheduler: LLMScheduler, requests: list[tuple[str, int]]) -> list:
+    """Queue `requests` as (session id, priority) behind a held slot and return the order they are admitted in."""
+
+    async def run():
+        order = []
+        blocker = await scheduler.acquire(1)
+
+        async def request(name, session_id, priority):
+            current_session_id.set(session_id)
+            current_priority.set(priority)
+            ticket = await scheduler.acquire(1)
+            order.append(name)
+            scheduler.release(ticket)
+
+        tasks = []
+        for i, (session_id, priority) in enumerate(requests):
+            tasks.append(
+                asyncio.create_task(request(f"{session_id}{i}", session_id, priority))
+            )
+            # queue them in the given order
+            await asyncio.sleep(0)
+        scheduler.release(blocker)
+        await asyncio.gather(*tasks)
+        return order
+
+    return asyncio.run(run())
+
+
+def test_lower_priority_value_is_served_first():
+    scheduler = LLMScheduler(max_concurrency=1)
+
+    order = admission_order(scheduler, [("a", 2), ("b", 1), ("c", 0)])
+
+    assert order == ["c2", "b1", "a0"]
+
+
+def test_sessions_of_a_priority_are_served_round_robin():
+    scheduler = LLMScheduler(max_concurrency=1)
+
+    order = admission_order(scheduler, [("a", 1), ("a", 1), ("a", 1), ("b", 1)])
+
+    assert order == ["a0", "b3", "a1", "a2"]
+
+
+def test_release_settles_actual_token_usage():
+    scheduler = LLMScheduler(tokens_per_minute=1000)
+
+    ticket = scheduler.acquire_sync(100)
+    scheduler.release(ticket, used_tokens=400)
+
+    assert 595 <= scheduler.metrics()["tokens_available"] <= 605
+
+
+def test_pause_holds_back_admissions():
+    scheduler = LLMScheduler(requests_per_minute=6000)
+
+    scheduler.pause(0.3)
+    started = time.monotonic()
+    scheduler.release(scheduler.acquire_sync(1))
+
+    assert time.monotonic() - started >= 0.3
+    assert scheduler.metrics()["rate_limited"] == 1
+
+
+def rate_limit_error(headers: dict) -> openai.RateLimitError:
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, headers=headers, request=request)
+    return openai.RateLimitError("Rate limit reached", response=response, body=None)
+
+
+def test_retry_after_headers():
+    assert retry_after(rate_limit_error({"retry-after-ms": "250"})) == 0.25
+    assert retry_after(rate_limit_error({"retry-after": "3"})) == 3
+    assert (
+        retry_after(
+            rate_limit_error(
+                {
+                    "x-ratelimit-reset-requests": "20ms",
+                    "x-ratelimit-reset-tokens": "6m0s",
+                }
+            )
+        )
+        == 360
+    )
+
+
+def test_rate_limit_pauses_the_scheduler_on_every_attempt(monkeypatch):
+    scheduler = LLMScheduler()
+    monkeypatch.setattr(model_policy, "llm_scheduler", scheduler)
+    error = rate_limit_error({"retry-after": "3"})
+
+    assert retry_delay(error, 0) == 0
+    # out of retries, the other sessions still have to hold back
+    assert retry_delay(error, LLM_MAX_RETRIES) is None
+    assert scheduler.metrics()["rate_limited"] == 2
+    assert 2.5 < scheduler.metrics()["paused_s"] <= 3
@@ -0,0 +1,133 @@
+import asyncio
+import time
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from src.agent import planner_agent
+from src.agent.planner_agent import Plan
+from src.utilities.model_policy import ModelPolicy, ainvoke_with_policy
+
+
+class SlowFakeChatModel(GenericFakeChatModel):
+    """Fake chat model that answers `content` after sleeping `delay_s`."""
+
+    delay_s: float = 0.0
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.delay_s)
+        return self._generate(messages, stop=stop, **kwargs)
+
+
+def fake_model(content: str, delay_s: float = 0.0) -> SlowFakeChatModel:
+    return SlowFakeChatModel(
+        messages=iter([AIMessage(content=content)]), delay_s=delay_s
+    )
+
+
+def test_hedged_request_wins_over_a_slow_one():
+    built = []
+
+    def build_runnable(model):
+        built.append(model)
+        # the first request is stuck, the hedged one answers right away
+        return fake_model(f"answer {len(built)}", delay_s=5 if len(built) == 1 else 0)
+
+    policy = ModelPolicy(model="primary", timeout_s=10, hedge=True, hedge_after_s=0.1)
+    started = time.perf_counter()
+    response = asyncio.run(
+        ainvoke_with_policy("test-hedge", build_runnable, "hi", policy)
+    )
+
+    assert response.content == "answer 2"
+    assert built == ["primary", "primary"]
+    assert time.perf_counter() - started < 1
+
+
+def test_fallback_model_answers_when_hedged_requests_time_out():
+    built = []
+
+    def build_runnable(model):
+        built.append(model)
+        return fake_model(model, delay_s=5 if model == "primary" else 0)
+
+    policy = ModelPolicy(
+        model="primary",
+        fallback_model="fallback",
+        timeout_s=0.3,
+        hedge=True,
+        hedge_after_s=0.1,
+    )
+    response = asyncio.run(
+        ainvoke_with_policy("test-hedge-timeout", build_runnable, "hi", policy)
+    )
+
+    assert response.content == "fallback"
+    assert built == ["primary", "primary", "fallback"]
+
+
+def test_deadline_without_fallback_raises_timeout():
+    policy = ModelPolicy(model="primary", timeout_s=0.2)
+    started = time.perf_counter()
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(
+            ainvoke_with_policy(
+                "test-deadline", lambda model: fake_model(model, 5), "hi", policy
+            )
+        )
+    assert time.perf_counter() - started < 1
+
+
+def test_fast_answer_is_not_hedged():
+    built = []
+
+    def build_runnable(model):
+        built.append(model)
+        return fake_model(model)
+
+    policy = ModelPolicy(model="primary", timeout_s=1, hedge=True, hedge_after_s=0.5)
+    response = asyncio.run(
+        ainvoke_with_policy("test-fast", build_runnable, "hi", policy)
+    )
+
+    assert response.content == "primary"
+    assert built == ["primary"]
+
+
+def test_fallback_model_answers_when_the_primary_errors():
+    class FailingFakeChatModel(SlowFakeChatModel):
+        async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+            raise ValueError("primary is down")
+
+    def build_runnable(model):
+        if model == "primary":
+            return FailingFakeChatModel(messages=iter([]))
+        return fake_model(model)
+
+    policy = ModelPolicy(model="primary", fallback_model="fallback", timeout_s=1)
+    response = asyncio.run(
+        ainvoke_with_policy("test-error", build_runnable, "hi", policy)
+    )
+
+    assert response.content == "fallback"
+
+
+def test_executor_timeout_leaves_the_step_unfinished(monkeypatch):
+    async def fake_ainvoke_with_policy(node, build_runnable, input, policy=None):
+        if node == "executor":
+            raise TimeoutError("executor did not answer")
+        return AIMessage(content="summary")
+
+    monkeypatch.setattr(planner_agent, "ainvoke_with_policy", fake_ainvoke_with_policy)
+    state = {
+        "task": "task",
+        "messages": [],
+        "plan": Plan(steps=["clone the repo", "answer"]),
+        "tools": [],
+    }
+
+    state = asyncio.run(planner_agent.simple_react_agent(state))
+
+    assert "did not finish in time" in state["messages"][-1].content
@@ -0,0 +1,45 @@
+import pytest
+
+from src.utilities import prefetch
+from src.utilities.prefetch import extract_repo_references
+
+
+@pytest.mark.parametrize(
+    "prompt, expected",
+    [
+        ("How does psf/requests handle retries?", ["psf/requests"]),
+        ("Summarize vercel/next.js", ["vercel/next.js"]),
+        (
+            "Compare vercel/next.js and remix-run/remix.",
+            ["vercel/next.js", "remix-run/remix"],
+        ),
+        ("Clone https://github.com/psf/requests.git please", ["psf/requests"]),
+        (
+            "Look at github.com/pallets/flask, then psf/requests",
+            ["pallets/flask", "psf/requests"],
+        ),
+        ("What is in (socketio/socket.io)?", ["socketio/socket.io"]),
+        ("explain src/main.py in psf/requests", ["psf/requests"]),
+        ("explain src/utils/main in psf/requests", ["psf/requests"]),
+        ("Read docs/README.md", []),
+        ("Is 1/2 of the tests failing since 2024/10?", []),
+        ("Use TCP/IP and/or client/server", []),
+        ("psf/requests and psf/requests again", ["psf/requests"]),
+        ("No repos here.", []),
+        ("look at src/agent and tests/unit", []),
+        ("use async/await", []),
+        ("compare React/Vue", []),
+        ("split it into frontend/backend", []),
+        ("see github.com/psf/requests/tree/main/src", ["psf/requests"]),
+        ("https://github.com/src/agent is a repo", ["src/agent"]),
+    ],
+)
+def test_extract_repo_references(prompt, expected):
+    assert extract_repo_references(prompt) == expected
+
+
+def test_cloned_repo_is_a_reference(tmp_path, monkeypatch):
+    monkeypatch.setattr(prefetch, "CLONE_DIR", f"{tmp_path}/")
+    (tmp_path / "src" / "agent").mkdir(parents=True)
+
+    assert extract_repo_references("look at src/agent and tests/unit") == ["src/agent"]
@@ -0,0 +1,44 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import tool
+
+from src.agent import react_agent
+
+
+@tool
+def first_tool() -> str:
+    """First tool."""
+    return "first"
+
+
+@tool
+def second_tool() -> str:
+    """Second tool."""
+    return "second"
+
+
+class FakeChatModel:
+    def bind_tools(self, tools):
+        return [tool.name for tool in tools]
+
+
+def test_graphs_keep_their_own_tools(monkeypatch):
+    bound_tools = []
+
+    async def fake_ainvoke_with_policy(node, build_runnable, input, policy=None):
+        bound_tools.append(build_runnable("model"))
+        return AIMessage(content="done")
+
+    monkeypatch.setattr(react_agent, "ainvoke_with_policy", fake_ainvoke_with_policy)
+    monkeypatch.setattr(react_agent, "chat_model", lambda model: FakeChatModel())
+
+    async def run():
+        first = await react_agent.build_agent([first_tool])
+        second = await react_agent.build_agent([second_tool])
+        for graph in (first, second, first):
+            await graph.ainvoke({"messages": [HumanMessage(content="hi")]})
+
+    asyncio.run(run())
+
+    assert bound_tools == [["first_tool"], ["second_tool"], ["first_tool"]]